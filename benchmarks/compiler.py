@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Compares interpreted and compiled export of the same objects
+
+    python benchmarks/compiler.py [--shops 200] [--repeat 5]
+
+Objects are read once and exported from memory, so timings do not include queries.
+Export is measured with xlsx writer and with writer discarding cells, the latter shows cost of exporter tree walk.
+
+Compilation speeds up only the tree walk, which is a small part of export into xlsx:
+time of xlsx export is spent in the writer, so it is not expected to be faster,
+the difference between its timings is usually within noise
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shops', type=int, default=200)
+    parser.add_argument('--products', type=int, default=5)
+    parser.add_argument('--properties', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+
+    from django.db import connection
+
+    from cronista.base import ExporterWriter
+    from tests.shop.exporter import ShopExporter
+    from tests.shop.models import Shop
+    from tests.shop.tests.factory import ShopFactory, ProductFactory, ProductPropertyFactory
+
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        for shop in ShopFactory.create_batch(size=args.shops):
+            for product in ProductFactory.create_batch(size=args.products, shop=shop):
+                ProductPropertyFactory.create_batch(size=args.properties, product=product)
+
+        class NullWriter(ExporterWriter):
+            def write(self, x, y, value):
+                pass
+
+            def write_row(self, y, x_start, values):
+                pass
+
+            def move_left(self, x_from, steps):
+                pass
+
+            def duplicate_range(self, min_col, min_row, max_col, max_row, row_shift=0, col_shift=0):
+                pass
+
+        shops = list(Shop.objects.prefetch_related('products__properties'))
+        for writer_name in ('xlsx', 'null'):
+            for compiled in (False, True):
+                exporter_class = type('BenchmarkShopExporter', (ShopExporter,), {'compiled': compiled})
+                timings = []
+                for _ in range(args.repeat):
+                    exporter = exporter_class()
+                    writer = exporter.exporter_writer if writer_name == 'xlsx' else NullWriter()
+                    started = time.perf_counter()
+                    exporter.export_objects(shops, writer)
+                    timings.append(time.perf_counter() - started)
+
+                mode = 'compiled' if compiled else 'interpreted'
+                print(f'{writer_name:>5} writer, {mode:>11}: best {min(timings):.3f}s of {args.repeat}')
+    finally:
+        connection.creation.destroy_test_db(connection.settings_dict['NAME'], verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 from cronista.base.abstract import ExporterWriter
 from cronista.base.abstract import BaseExporter
 from cronista.base.abstract import ModelReader
+from cronista.base.multi import MultiExporterWriter
 from cronista.base.model import ModelExporter
 from cronista.base.nested import NestedExporter
 
@@ -8,6 +9,7 @@ __all__ = [
     'ExporterWriter',
     'BaseExporter',
     'ModelReader',
+    'MultiExporterWriter',
     'ModelExporter',
     'NestedExporter',
 ]
@@ -4,7 +4,10 @@ import abc
 class ExporterWriter(abc.ABC):
     """
     Class for every specific file write implementations
+
+    extension - extension of produced files
     """
+    extension = None
 
     def write(self, x, y, value):
         """
@@ -12,6 +15,22 @@ class ExporterWriter(abc.ABC):
         """
         raise NotImplementedError()
 
+    def write_row(self, y, x_start, values):
+        """
+        Writes values into row y, starting from column x_start
+
+        Writers may override it with faster bulk implementation
+        """
+        for x, value in enumerate(values, x_start):
+            self.write(x=x, y=y, value=value)
+
+    def write_block(self, y_start, x_start, rows):
+        """
+        Writes list of rows (lists of values) starting from cell (x_start, y_start)
+        """
+        for y, values in enumerate(rows, y_start):
+            self.write_row(y=y, x_start=x_start, values=values)
+
     def move_left(self, x_from, steps):
         """
         Method should implement logic of moving all data from x_from for steps
@@ -34,6 +53,12 @@ class ExporterWriter(abc.ABC):
         """Method should freeze range"""
         raise NotImplementedError()
 
+    def release_memory(self):
+        """
+        Writers may free memory taken by written data, e.g. move rows into temporary file,
+        called between chunks of root objects when export is over memory limit
+        """
+
     def to_response(self, filename='export'):
         raise NotImplementedError()
 
@@ -43,6 +68,17 @@ class ExporterWriter(abc.ABC):
     def to_binary(self):
         raise NotImplementedError()
 
+    def to_html(self):
+        """Method should render written data as html table"""
+        raise NotImplementedError()
+
+    def load_binary(self, content: bytes):
+        """
+        Method should make writer return already produced content
+        instead of data written so far, e.g. content taken from cache
+        """
+        raise NotImplementedError()
+
 
 class BaseExporter(abc.ABC):
 
@@ -78,3 +114,84 @@ class ModelReader(object):
 
     def get_related_field_value(self, obj, field_name: str):
         raise NotImplementedError()
+
+    def get_field_getter(self, field_name: str):
+        """
+        Returns function reading value of field_name from object, used by compiled exporters,
+        readers may return specialised functions, e.g. plain attribute getters
+        """
+        get_field_value = self.get_field_value
+        return lambda obj: get_field_value(obj, field_name)
+
+    def parse_field_value(self, field_name: str, value):
+        """
+        Method should convert value read from exported file back to field value,
+        it is reverse of get_field_value
+        """
+        raise NotImplementedError()
+
+    def get_chunk(self, objects, offset: int, limit: int, last=None) -> list:
+        """
+        Returns list of at most `limit` objects starting from `offset`,
+        last - last object of previous chunk, readers may use it to continue reading after it
+        """
+        return list(objects[offset:offset + limit])
+
+    def requires_prefetch(self, field_name: str):
+        """Returns True if related objects of field_name should always be prefetched"""
+        return False
+
+    def get_prefetch(self, field_name: str, exporter_class, using: str = None):
+        """
+        Method should return object describing how related objects of field_name
+        are loaded for exporter_class from database `using`: its limit, ordering and nested prefetches
+        """
+        raise NotImplementedError()
+
+    def get_lookup(self, field_name: str):
+        """
+        Method should return lookup of related field used in count_related
+        or None if related objects of field can't be counted
+        """
+        return None
+
+    def count_related(self, objects, row_lookups: list, column_lookups: list):
+        """
+        Method should return:
+        - number of objects;
+        - total number of related objects over row_lookups except the first one for each object;
+        - dict of maximum number of related objects per object for each of column_lookups
+
+        Readers without lookups of related fields only count objects
+        """
+        if row_lookups or column_lookups:
+            raise NotImplementedError()
+
+        return len(list(objects)), 0, {}
+
+    def get_select_related(self, field_names) -> list:
+        """Returns lookups of related objects which should be loaded together with objects to read field_names"""
+        return []
+
+    def select_related(self, objects, lookups: list):
+        """Method should load related objects of lookups together with objects"""
+        raise NotImplementedError()
+
+    def annotate(self, objects, annotations: dict):
+        """Method should attach computed annotations {name: Annotation} to objects"""
+        raise NotImplementedError()
+
+    def use_database(self, objects, using: str):
+        """Method should make objects be read from database `using`"""
+        raise NotImplementedError()
+
+    def snapshot(self, objects):
+        """
+        Method should return context manager in which all reads of objects
+        and their related objects see the same snapshot of data
+        """
+        raise NotImplementedError()
+
+    def prefetch_related(self, objects, prefetches: list):
+        """Method should load prefetches for all objects at once"""
+        raise NotImplementedError()
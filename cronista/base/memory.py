@@ -0,0 +1,79 @@
+import gc
+import os
+import tracemalloc
+
+from cronista.base.abstract import ExporterWriter
+
+
+class MemoryLimitExceeded(Exception):
+    pass
+
+
+class MemoryGovernor(object):
+    """
+    Keeps memory used by export under limit (in bytes), memory is checked between chunks of root objects
+
+    When memory is over limit governor:
+    - collects garbage and asks writer to release memory, e.g. to spill written rows into temporary file;
+    - if it is still over limit, halves chunk_size of exporter,
+      so less objects together with their prefetched related objects are kept at once;
+    - if chunk is already one object, raises MemoryLimitExceeded
+
+    measure - TRACEMALLOC: memory allocated by python, precise and drops when memory is released,
+        but tracing every allocation slows export down several times;
+        RSS: resident memory of process, available on linux and costs nothing to measure,
+        but allocator rarely returns freed memory to the system, so it does not drop after releasing memory:
+        governor only halves chunks and fails when rss grows over the limit, it can not recover
+    """
+    TRACEMALLOC = 'tracemalloc'
+    RSS = 'rss'
+
+    def __init__(self, limit: int, exporter_writer: ExporterWriter, measure: str = TRACEMALLOC):
+        if measure not in (self.TRACEMALLOC, self.RSS):
+            raise ValueError(f'Unknown memory measure {measure}')
+        if measure == self.RSS and not os.path.exists('/proc/self/statm'):
+            raise ValueError('Resident memory can be measured only on linux')
+
+        self.limit = limit
+        self.exporter_writer = exporter_writer
+        self.measure = measure
+        self._started = False
+
+    def __enter__(self):
+        if self.measure == self.TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def get_usage(self) -> int:
+        if self.measure == self.TRACEMALLOC:
+            current, _ = tracemalloc.get_traced_memory()
+            return current
+
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+    def check(self, exporter):
+        """Called by exporter before reading next chunk of objects"""
+        if self.get_usage() <= self.limit:
+            return
+
+        gc.collect()
+        self.exporter_writer.release_memory()
+        usage = self.get_usage()
+        if usage <= self.limit:
+            return
+
+        if exporter.chunk_size > 1:
+            exporter.chunk_size = max(exporter.chunk_size // 2, 1)
+            return
+
+        raise MemoryLimitExceeded(
+            f'{exporter.__class__.__name__} uses {usage / 1024 / 1024:.1f} MiB of memory ({self.measure}) '
+            f'reading objects one by one, limit is {self.limit / 1024 / 1024:.1f} MiB'
+        )
@@ -1,6 +1,10 @@
-from typing import Dict
+import warnings
+from contextlib import contextmanager
+from typing import Dict, NamedTuple
 
 from cronista.base import ExporterWriter, ModelReader, BaseExporter
+from cronista.base.memory import MemoryGovernor
+from cronista.base.multi import MultiExporterWriter
 from cronista.base.shift import Shift
 
 
@@ -36,14 +40,42 @@ class ModelExporter(ColumnWidthMixin):
         exporter reads data from these fields and places data into appropriate cells
     related - defines related exporters, e.g. for m2m objects, lists, nested dicts
     model_reader - object, defining logic of reading field values from data (django qs, json, sqlAlchemy qs)
+    annotations - defines computed fields, e.g. {'total': Annotation(Sum('items__price'), 'Total')},
+        they are attached to queryset by annotate_qs and exported when listed in fields
+    limit - maximum number of objects exported when exporter is used as related one,
+        readers push it down into storage together with ordering, e.g. sql window function
+    ordering - ordering of objects when exporter is used as related one
+    chunk_size - number of root objects read from storage at once, all objects are read by one query if None
+    using - database alias used for root objects and all related objects, e.g. read replica
+    snapshot - reads all objects (e.g. all chunks) in one read transaction to see consistent data
+    strict_queries - counts queries executed during export and warns (STRICT_WARN) or fails (STRICT_RAISE)
+        when any field executes query per object or when total number of queries exceeds max_queries
+    memory_limit - maximum memory in bytes used by export, measured by memory_measure between chunks
+        of root objects, so it requires chunk_size. See MemoryGovernor for how export adapts to it
+    compiled - exports objects with export_obj functions generated for exporter classes
+        (see cronista.base.compiler), output is the same, exports with strict_queries are not compiled
     """
     HORIZONTAL = 1
     VERTICAL = 2
 
+    STRICT_WARN = 'warn'
+    STRICT_RAISE = 'raise'
+
     fields = ()
     related: Dict[str, 'ModelExporter'] = {}
     state = VERTICAL
     model_reader: ModelReader = None
+    annotations: Dict[str, object] = {}
+    limit: int = None
+    ordering = ()
+    chunk_size: int = None
+    using: str = None
+    snapshot = False
+    strict_queries = None
+    max_queries = None
+    memory_limit: int = None
+    memory_measure = MemoryGovernor.TRACEMALLOC
+    compiled = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -51,6 +83,8 @@ class ModelExporter(ColumnWidthMixin):
             raise NotImplementedError('Model reader must be specified')
 
         self.nested_exporters: Dict[str, 'NestedExporter'] = self.init_nested()
+        self.max_objects = None
+        self.memory_governor = None
 
     def init_nested(self):
         """
@@ -93,6 +127,112 @@ class ModelExporter(ColumnWidthMixin):
         else:
             return max([e.get_depth() for e in cls.related.values()]) + 1
 
+    @classmethod
+    def get_prefetches(cls, using: str = None):
+        """
+        Returns reader specific prefetches of related exporters
+        which should be loaded together with objects of this exporter
+        """
+        return [
+            cls.model_reader.get_prefetch(name, exporter, using=using)
+            for name, exporter in cls.related.items()
+            if exporter.requires_prefetch() or cls.model_reader.requires_prefetch(name)
+        ]
+
+    @classmethod
+    def requires_prefetch(cls):
+        """Returns True if related objects for this exporter have to be prefetched by parent"""
+        return (
+            cls.limit is not None or
+            bool(cls.ordering) or
+            bool(cls.annotations) or
+            bool(cls.get_select_related()) or
+            bool(cls.get_prefetches())
+        )
+
+    @classmethod
+    def get_select_related(cls):
+        """Returns reader specific lookups of related objects which fields are exported"""
+        return cls.model_reader.get_select_related(cls.fields)
+
+    def set_related_limit(self, limit: int):
+        """Limits number of related objects exported by all nested exporters"""
+        for nested in self.nested_exporters.values():
+            nested.set_limit(limit)
+
+    @classmethod
+    def get_row_lookups(cls, prefix=''):
+        """
+        Returns lookups of related objects which are placed on separate rows:
+        the deepest vertical exporters of every branch
+        """
+        lookups = []
+        for name, exporter in cls.related.items():
+            lookup = cls.model_reader.get_lookup(name)
+            if lookup is None:
+                continue
+
+            nested_lookups = exporter.get_row_lookups(prefix=f'{prefix}{lookup}__')
+            if exporter.state == cls.VERTICAL and not nested_lookups:
+                lookups.append(f'{prefix}{lookup}')
+            lookups.extend(nested_lookups)
+
+        return lookups
+
+    @classmethod
+    def get_column_lookups(cls, prefix=''):
+        """Returns lookups of related objects which are placed on separate columns: horizontal exporters"""
+        lookups = []
+        for name, exporter in cls.related.items():
+            lookup = cls.model_reader.get_lookup(name)
+            if lookup is None:
+                continue
+
+            if exporter.state == cls.HORIZONTAL:
+                lookups.append(f'{prefix}{lookup}')
+            lookups.extend(exporter.get_column_lookups(prefix=f'{prefix}{lookup}__'))
+
+        return lookups
+
+    @classmethod
+    def estimate_columns(cls, max_counts: Dict[str, int], prefix=''):
+        """
+        Returns estimated number of columns for exporting one object,
+        max_counts - maximum numbers of related objects of horizontal exporters per root object
+        """
+        size = cls.get_fields_size()
+        for name, exporter in cls.related.items():
+            lookup = cls.model_reader.get_lookup(name)
+            nested_prefix = f'{prefix}{lookup}__'
+            nested_size = exporter.estimate_columns(max_counts, prefix=nested_prefix)
+            if exporter.state == cls.HORIZONTAL:
+                number = max(max_counts.get(f'{prefix}{lookup}') or 1, 1)
+                if exporter.limit is not None:
+                    number = min(number, exporter.limit)
+                nested_size *= number
+            size += nested_size
+
+        return size
+
+    def estimate_size(self, objects):
+        """
+        Returns estimated number of rows and columns of the full export of objects,
+        calculated with aggregate queries without reading objects
+
+        Related objects are counted per root object, so for exporters nested
+        into horizontal ones the estimate is an upper bound
+        """
+        if self.using is not None:
+            objects = self.model_reader.use_database(objects, self.using)
+
+        count, extra_rows, max_counts = self.model_reader.count_related(
+            objects,
+            row_lookups=self.get_row_lookups(),
+            column_lookups=self.get_column_lookups(),
+        )
+        rows = self.get_depth() + count + extra_rows
+        return rows, self.estimate_columns(max_counts)
+
     def shift(self, columns_shift: int):
         """
         Performs shift of all nested exporters
@@ -105,20 +245,141 @@ class ModelExporter(ColumnWidthMixin):
         """
         Export entry point. Used only once for the first exporter
         """
-        objects = self.annotate_qs(objects)
+        if self.strict_queries is None:
+            self.export_objects(objects, exporter_writer)
+        else:
+            self.export_objects_strict(objects, exporter_writer)
+
+        self.export_header(exporter_writer)
+        self.export_header_after(exporter_writer)
+
+    def export_objects(self, objects, exporter_writer: ExporterWriter):
+        """
+        Prepares root objects (database, annotations, prefetches) and exports them
+
+        Returns number of exported objects
+        """
+        if self.using is not None:
+            objects = self.model_reader.use_database(objects, self.using)
+
+        objects = self.prefetch_qs(self.select_qs(self.annotate_qs(objects)))
+        with self.limit_memory(exporter_writer):
+            if not self.snapshot:
+                return self.write_objects(objects, exporter_writer)
+
+            with self.model_reader.snapshot(objects):
+                return self.write_objects(objects, exporter_writer)
+
+    @contextmanager
+    def limit_memory(self, exporter_writer: ExporterWriter):
+        """Checks memory between chunks of objects exported inside, if memory_limit is set"""
+        if self.memory_limit is None:
+            yield
+            return
+
+        if self.chunk_size is None:
+            raise ValueError(f'Memory limit of {self.__class__.__name__} requires chunk_size')
+
+        with MemoryGovernor(self.memory_limit, exporter_writer, measure=self.memory_measure) as governor:
+            self.memory_governor = governor
+            try:
+                yield
+            finally:
+                self.memory_governor = None
+
+    def write_objects(self, objects, exporter_writer: ExporterWriter):
+        """
+        Writes objects one under another, returns number of written objects
+        """
+        if self.compiled and self.strict_queries is None:
+            from cronista.base.compiler import write_objects
+
+            return write_objects(self, objects, exporter_writer)
+
         row = self.get_start_row()
         shift = Shift()
-        for obj in objects:
+        count = 0
+        for obj in self.iterate_objects(objects):
             self.shift_end_column(shift.col)
             shift = self.export_obj(obj, exporter_writer, row=row)
             row += shift.row
             row += 1
+            count += 1
+            if self.max_objects is not None and count >= self.max_objects:
+                # the next object is not read, so the next chunk is not fetched
+                break
 
-        self.export_header(exporter_writer)
-        self.export_header_after(exporter_writer)
+        return count
+
+    def export_objects_strict(self, objects, exporter_writer: ExporterWriter):
+        """
+        Exports objects counting executed queries, reports fields that cause query per object
+        """
+        from django.db import DEFAULT_DB_ALIAS
+
+        from cronista.base.queries import QueryCounter, QueryBudgetExceeded, QueryBudgetWarning, counting_queries
+
+        using = self.using or getattr(objects, 'db', DEFAULT_DB_ALIAS)
+        with QueryCounter(using=using, exporter_name=self.__class__.__name__) as counter, counting_queries(self):
+            self.export_objects(objects, exporter_writer)
+
+        problems = counter.get_problems(max_queries=self.max_queries)
+        if not problems:
+            return
+
+        message = f'{self.__class__.__name__} query budget exceeded: ' + '; '.join(problems)
+        if self.strict_queries == self.STRICT_RAISE:
+            raise QueryBudgetExceeded(message)
+
+        warnings.warn(message, QueryBudgetWarning)
+
+    def iterate_objects(self, objects):
+        """
+        Yields root objects reading them from storage by chunks of chunk_size
+
+        chunk_size is read before every chunk, so it may be changed during export, e.g. by memory governor
+        """
+        if self.chunk_size is None:
+            yield from objects
+            return
+
+        offset = 0
+        last = None
+        while True:
+            chunk_size = self.chunk_size
+            if chunk_size < 1:
+                raise ValueError(f'Chunk size of {self.__class__.__name__} should be positive, got {chunk_size}')
+
+            chunk = self.model_reader.get_chunk(objects, offset, chunk_size, last=last)
+            yield from chunk
+            if len(chunk) < chunk_size:
+                break
+            offset += len(chunk)
+            last = chunk[-1]
+
+            if self.memory_governor is not None:
+                chunk = None  # exported objects are not counted
+                self.memory_governor.check(self)
 
     def annotate_qs(self, qs):
-        return qs
+        if not self.annotations:
+            return qs
+
+        return self.model_reader.annotate(qs, self.annotations)
+
+    def select_qs(self, qs):
+        lookups = self.get_select_related()
+        if not lookups:
+            return qs
+
+        return self.model_reader.select_related(qs, lookups)
+
+    def prefetch_qs(self, qs):
+        prefetches = self.get_prefetches(using=self.using)
+        if not prefetches:
+            return qs
+
+        return self.model_reader.prefetch_related(qs, prefetches)
 
     def export_obj(self, obj, export_writer: ExporterWriter, row: int):
         """
@@ -134,11 +395,9 @@ class ModelExporter(ColumnWidthMixin):
             to_shift_names = all_names[current_index + 1:]
             [self.nested_exporters[_nested].shift(shift_col) for _nested in to_shift_names]
 
-        col = self.column_start
-        for field in self.fields:
-            value = self.get_field_value(obj, field)
-            export_writer.write(x=col, y=row, value=value)
-            col += 1
+        if self.fields:
+            values = [self.get_field_value(obj, field) for field in self.fields]
+            export_writer.write_row(y=row, x_start=self.column_start, values=values)
 
         return_shift = Shift()
         for name, nested in self.nested_exporters.items():
@@ -155,6 +414,15 @@ class ModelExporter(ColumnWidthMixin):
         data = self.model_reader.get_related_field_value(obj, field_name)
         return nested_exporter.export(qs=data, export_writer=export_writer, row=row)
 
+    @classmethod
+    def get_field_name(cls, field_name: str):
+        """Returns header of field, name of annotation is taken from its declaration"""
+        annotation = cls.annotations.get(field_name)
+        if annotation is not None:
+            return annotation.verbose_name
+
+        return cls.model_reader.get_field_name(field_name)
+
     def get_field_value(self, obj, field_name: str):
         """
         This field returns raw data that will be places into file
@@ -175,7 +443,7 @@ class ModelExporter(ColumnWidthMixin):
                 max_row=row + depth - 1 if depth > 1 else row
             )
 
-            value = self.model_reader.get_field_name(field)
+            value = self.get_field_name(field)
             exporter_writer.write(x=col, y=row, value=value)
             col += 1
 
@@ -184,7 +452,7 @@ class ModelExporter(ColumnWidthMixin):
             #     f'Nested: {nested_exporter.__class__.__name__} of {name}: '
             #     f'{nested_exporter.column_start}, {nested_exporter.column_end} in {row} + 1'
             # )
-            value = self.model_reader.get_field_name(name)
+            value = self.get_field_name(name)
             exporter_writer.write(x=nested_exporter.column_start, y=row, value=value)
             exporter_writer.merge_range(
                 min_col=nested_exporter.column_start,
@@ -204,16 +472,88 @@ class ModelExporter(ColumnWidthMixin):
             nested.debug_structure()
 
 
+class Preview(NamedTuple):
+    """
+    content - binary file or html table with first objects
+    rows, columns - estimated size of the full export
+    """
+    content: object
+    rows: int
+    columns: int
+
+
 class ModelExporterWriter(ModelExporter, BaseExporter):
+    """
+    cache - optional ExportCache, stores produced binary keyed by exporter, queryset and data version
+    cache_version - optional callable returning data version token for queryset, e.g. MaxFieldVersion,
+        without it cached result is not invalidated when data changes and is returned until it expires
+
+    writers - optional list of writers to export data into at once instead of writer_class,
+        e.g. ShopExporter(writers=[OpenPyXlWriter(), CsvWriter()])
+    """
     writer_class = None
+    cache = None
+    cache_version = None
 
-    def __init__(self):
-        writer = self.writer_class()
+    def __init__(self, writers: [ExporterWriter] = None):
+        if writers:
+            writer = MultiExporterWriter(writers)
+        else:
+            writer = self.writer_class()
         super().__init__(exporter_writer=writer, column_start=1)
 
     def export(self, qs):
+        cache_key = self.get_cache_key(qs)
+        if cache_key is not None:
+            content = self.cache.get(cache_key)
+            if content is not None:
+                self.exporter_writer.load_binary(content)
+                return
+
         super().export(qs, self.exporter_writer)
 
+        if cache_key is not None:
+            # file is produced once: cached content is returned by as_binary, as_file, etc
+            content = self.exporter_writer.to_binary()
+            self.exporter_writer.load_binary(content)
+            self.cache.set(cache_key, content)
+
+    def get_cache_key(self, qs):
+        """Returns key of export result or None if result should not be cached"""
+        if self.cache is None:
+            return None
+
+        from cronista.cache import make_cache_key
+
+        if self.using is not None:
+            # version is read from the same database as exported data
+            qs = self.model_reader.use_database(qs, self.using)
+
+        if isinstance(self.exporter_writer, MultiExporterWriter):
+            writers = self.exporter_writer.writers
+        else:
+            writers = [self.exporter_writer]
+
+        version = self.cache_version(qs) if self.cache_version is not None else None
+        return make_cache_key(self.__class__, qs, version, writer_classes=[type(writer) for writer in writers])
+
+    def preview(self, qs, size=10, html=False) -> Preview:
+        """
+        Exports only first `size` root objects and first `size` related objects of each nested exporter,
+        returns file or html table together with estimated size of the full export
+        """
+        if size < 1:
+            raise ValueError(f'Preview size should be positive, got {size}')
+
+        self.max_objects = size
+        self.chunk_size = min(self.chunk_size or size, size)
+        self.set_related_limit(size)
+        super().export(qs, self.exporter_writer)
+
+        rows, columns = self.estimate_size(qs)
+        content = self.exporter_writer.to_html() if html else self.exporter_writer.to_binary()
+        return Preview(content=content, rows=rows, columns=columns)
+
 
 def init_nested(exporter: 'ModelExporter', start_col):
     from cronista.base.nested import nested_vertical, nested_horizontal
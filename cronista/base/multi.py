@@ -0,0 +1,108 @@
+import io
+import zipfile
+from urllib.parse import quote
+
+from django.http import HttpResponse
+
+from cronista.base.abstract import ExporterWriter
+
+
+class MultiExporterWriter(ExporterWriter):
+    """
+    Replays every write operation to several writers,
+    so data is read and laid out once for any number of output formats
+
+    Binary of several writers is zip archive with file of every writer,
+    so it can be stored in export cache and returned as one http response
+    """
+    extension = 'zip'
+
+    def __init__(self, writers: [ExporterWriter]):
+        super().__init__()
+        self.writers = list(writers)
+
+    def write(self, x, y, value):
+        for writer in self.writers:
+            writer.write(x=x, y=y, value=value)
+
+    def write_row(self, y, x_start, values):
+        values = list(values)
+        for writer in self.writers:
+            writer.write_row(y=y, x_start=x_start, values=values)
+
+    def write_block(self, y_start, x_start, rows):
+        rows = [list(values) for values in rows]
+        for writer in self.writers:
+            writer.write_block(y_start=y_start, x_start=x_start, rows=rows)
+
+    def move_left(self, x_from, steps):
+        for writer in self.writers:
+            writer.move_left(x_from=x_from, steps=steps)
+
+    def duplicate_range(self, min_col, min_row, max_col, max_row, row_shift=0, col_shift=0):
+        for writer in self.writers:
+            writer.duplicate_range(
+                min_col=min_col,
+                min_row=min_row,
+                max_col=max_col,
+                max_row=max_row,
+                row_shift=row_shift,
+                col_shift=col_shift,
+            )
+
+    def merge_range(self, min_col, min_row, max_col, max_row):
+        for writer in self.writers:
+            writer.merge_range(min_col=min_col, min_row=min_row, max_col=max_col, max_row=max_row)
+
+    def freeze_panes(self, col, row):
+        for writer in self.writers:
+            writer.freeze_panes(col=col, row=row)
+
+    def release_memory(self):
+        for writer in self.writers:
+            writer.release_memory()
+
+    def to_file(self, filename='export'):
+        """Saves every writer into file `filename` with extension of writer"""
+        filename = filename or 'export'
+        for writer in self.writers:
+            writer.to_file(f'{filename}.{writer.extension}')
+
+    def to_html(self):
+        """Renders data by the first writer able to render html"""
+        for writer in self.writers:
+            try:
+                return writer.to_html()
+            except NotImplementedError:
+                continue
+
+        raise NotImplementedError()
+
+    def get_names(self, filename='export'):
+        """Returns names of writer files in archive, writers of the same format are numbered"""
+        names = []
+        for i, writer in enumerate(self.writers, 1):
+            name = f'{filename}.{writer.extension}'
+            if name in names:
+                name = f'{filename}-{i}.{writer.extension}'
+            names.append(name)
+        return names
+
+    def to_binary(self):
+        """Returns zip archive with binaries of writers"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, writer in zip(self.get_names(), self.writers):
+                archive.writestr(name, writer.to_binary())
+        return buffer.getvalue()
+
+    def load_binary(self, content: bytes):
+        """Loads binary of every writer from zip archive made by to_binary"""
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            for name, writer in zip(self.get_names(), self.writers):
+                writer.load_binary(archive.read(name))
+
+    def to_response(self, filename='export'):
+        response = HttpResponse(content=self.to_binary(), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename={}'.format(quote(f'{filename}.zip'))
+        return response
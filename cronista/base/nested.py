@@ -13,6 +13,8 @@ class NestedExporter(ColumnWidthMixin):
     def __init__(self, exporter_class: type(ModelExporter), *args, **kwargs):
         self.exporter_class: type(ModelExporter) = exporter_class
         self.exporters: [ModelExporter] = []
+        self.limit = exporter_class.limit
+        self.nested_limit = None
         super().__init__(*args, **kwargs)
         self.new()
 
@@ -36,6 +38,8 @@ class NestedExporter(ColumnWidthMixin):
         already_has = len(self.exporters) > 0
         column = self.exporters[-1].column_end + 1 if already_has else self.column_start
         exporter: ModelExporter = self.exporter_class(column_start=column)
+        if self.nested_limit is not None:
+            exporter.set_related_limit(self.nested_limit)
         self.exporters.append(exporter)
 
         shift_col = exporter.get_size()
@@ -57,6 +61,24 @@ class NestedExporter(ColumnWidthMixin):
         """
         raise NotImplementedError()
 
+    def set_limit(self, limit: int):
+        """Limits number of objects of this and all deeper nested exporters"""
+        self.limit = limit if self.limit is None else min(self.limit, limit)
+        self.nested_limit = limit
+        for exporter in self.exporters:
+            exporter.set_related_limit(limit)
+
+    def limit_objects(self, qs: [QuerySet, list]):
+        """
+        Cuts objects to limit of exporter class
+
+        Prefetched objects are already limited by reader, so it only matters for not prefetched data
+        """
+        if self.limit is None:
+            return qs
+
+        return qs[:self.limit]
+
     def export_header(self, export_writer: ExporterWriter, row: int):
         for exporter in self.exporters:
             exporter.export_header(exporter_writer=export_writer, row=row)
@@ -76,6 +98,7 @@ class NestedVertical(NestedExporter):
         :param export_writer: object that implements ExporterWriter interface and allows to write
         :param row:
         """
+        qs = self.limit_objects(qs)
         exporter = self.exporters[0]
         object_exporters = [
             [obj, exporter] for obj in qs
@@ -109,6 +132,7 @@ class NestedHorizontal(NestedExporter):
         :param export_writer: object that implements ExporterWriter interface and allows to write
         :param row:
         """
+        qs = self.limit_objects(qs)
         count_objects = len(qs)
         count_exporters = self.get_number()
 
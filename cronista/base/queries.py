@@ -0,0 +1,154 @@
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# counter of export running in current context, exporters record sites of their queries in it
+active_query_counter = ContextVar('cronista_query_counter', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryBudgetWarning(RuntimeWarning):
+    pass
+
+
+class QueryCounter(object):
+    """
+    Counts queries executed on database connection
+    grouped by site - exporter and field which caused the query
+
+    Exporters record sites explicitly while their classes are swapped by `counting_queries`:
+    field being read is pushed with `site` and every exported object is counted with `count_object`.
+    Queries executed outside of exporter fields (e.g. evaluating root queryset
+    together with its prefetches) are grouped under site with field None
+    """
+
+    def __init__(self, using: str, exporter_name: str):
+        self.using = using
+        self.exporter_name = exporter_name
+        self.sites = Counter()
+        self.exporter_objects = Counter()
+        self._stack = []
+        self._wrapper = None
+        self._token = None
+
+    def __enter__(self):
+        from django.db import connections
+
+        self._wrapper = connections[self.using].execute_wrapper(self)
+        self._wrapper.__enter__()
+        self._token = active_query_counter.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        active_query_counter.reset(self._token)
+        self._wrapper.__exit__(*exc_info)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.sites[self.find_site()] += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def site(self, exporter, field_name: str):
+        """Queries executed inside are attributed to field_name of exporter"""
+        self._stack.append((exporter.__class__.__name__, field_name))
+        try:
+            yield
+        finally:
+            self._stack.pop()
+
+    def count_object(self, exporter):
+        self.exporter_objects[exporter.__class__.__name__] += 1
+
+    def find_site(self):
+        if self._stack:
+            return self._stack[-1]
+
+        return self.exporter_name, None
+
+    @property
+    def total(self):
+        return sum(self.sites.values())
+
+    def get_problems(self, max_queries=None):
+        """
+        Returns list of descriptions of budget violations:
+        - total number of queries is more than max_queries;
+        - field executes query for every object of its exporter, so number of queries grows with number of objects
+        """
+        problems = []
+        if max_queries is not None and self.total > max_queries:
+            problems.append(f'{self.total} queries executed, budget is {max_queries}')
+
+        for (exporter_name, field_name), count in self.sites.items():
+            if field_name is None:
+                continue
+
+            # field is read once per object of its exporter, at any depth of export
+            objects = self.exporter_objects[exporter_name]
+            if objects > 1 and count >= objects:
+                problems.append(f'{exporter_name}.{field_name} executed {count} queries for {objects} objects')
+
+        return problems
+
+
+class QueryCountingMixin(object):
+    """
+    Records sites of queries in active counter
+
+    It is mixed into exporter classes only for strict export, so other exports run without it
+    """
+
+    def export_obj(self, obj, export_writer, row: int):
+        active_query_counter.get().count_object(self)
+        return super().export_obj(obj, export_writer, row=row)
+
+    def _export_nested(self, field_name: str, obj, nested_exporter, export_writer, row: int):
+        # related objects are usually lazy, so queries run while nested exporter reads them
+        with active_query_counter.get().site(self, field_name):
+            return super()._export_nested(field_name, obj, nested_exporter, export_writer, row)
+
+    def get_field_value(self, obj, field_name: str):
+        with active_query_counter.get().site(self, field_name):
+            return super().get_field_value(obj, field_name)
+
+
+_counting_classes = weakref.WeakKeyDictionary()
+
+
+def get_counting_class(exporter_class: type):
+    """Returns subclass of exporter class with the same name recording sites of queries, as well as its related"""
+    counting_class = _counting_classes.get(exporter_class)
+    if counting_class is None:
+        counting_class = _counting_classes[exporter_class] = type(exporter_class.__name__, (
+            QueryCountingMixin, exporter_class
+        ), {
+            '__module__': exporter_class.__module__,
+            '__qualname__': exporter_class.__qualname__,
+            'related': {name: get_counting_class(related) for name, related in exporter_class.related.items()},
+            'counted_class': exporter_class,
+        })
+
+    return counting_class
+
+
+def swap_classes(exporter, get_class):
+    """Replaces classes of exporter and all its nested exporters by get_class(class)"""
+    exporter.__class__ = get_class(exporter.__class__)
+    for nested in exporter.nested_exporters.values():
+        nested.exporter_class = get_class(nested.exporter_class)
+        for nested_exporter in nested.exporters:
+            swap_classes(nested_exporter, get_class)
+
+
+@contextmanager
+def counting_queries(exporter):
+    """Makes exporter tree record sites of queries in active counter while export runs inside"""
+    swap_classes(exporter, get_counting_class)
+    try:
+        yield
+    finally:
+        swap_classes(exporter, lambda exporter_class: exporter_class.counted_class)
@@ -0,0 +1,15 @@
+from cronista.cache.backends import ExportCache
+from cronista.cache.backends import DjangoExportCache
+from cronista.cache.backends import FileLRUExportCache
+from cronista.cache.backends import make_cache_key
+from cronista.cache.versions import MaxFieldVersion
+from cronista.cache.versions import CounterVersion
+
+__all__ = [
+    'ExportCache',
+    'DjangoExportCache',
+    'FileLRUExportCache',
+    'make_cache_key',
+    'MaxFieldVersion',
+    'CounterVersion',
+]
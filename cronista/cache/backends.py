@@ -0,0 +1,142 @@
+import abc
+import hashlib
+import os
+import tempfile
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import EmptyResultSet
+from django.db.models import QuerySet
+
+
+def make_cache_key(exporter_class: type, qs: QuerySet, version=None, writer_classes=()):
+    """
+    Returns key of export result built from exporter class, classes of writers producing the result,
+    compiled sql of queryset with its params and data version token.
+
+    Returns None if objects are not a queryset and could not be keyed
+    """
+    if not isinstance(qs, QuerySet):
+        return None
+
+    try:
+        sql, params = qs.query.sql_with_params()
+    except EmptyResultSet:
+        sql, params = '', ()
+
+    parts = [
+        f'{exporter_class.__module__}.{exporter_class.__qualname__}',
+        ','.join(f'{writer_class.__module__}.{writer_class.__qualname__}' for writer_class in writer_classes),
+        qs.db,
+        sql,
+        repr(params),
+        repr(version),
+    ]
+    return hashlib.sha256('\x00'.join(parts).encode()).hexdigest()
+
+
+class ExportCache(abc.ABC):
+    """
+    Storage of produced export binaries
+    """
+
+    def get(self, key: str):
+        """Method should return stored binary or None"""
+        raise NotImplementedError()
+
+    def set(self, key: str, content: bytes):
+        """Method should store binary under the key"""
+        raise NotImplementedError()
+
+
+class DjangoExportCache(ExportCache):
+    """
+    Stores export results in one of django caches
+
+    timeout - seconds to keep results, TIMEOUT of the cache by default, None keeps them forever
+    """
+    key_prefix = 'cronista'
+
+    def __init__(self, alias='default', timeout=DEFAULT_TIMEOUT):
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, key: str):
+        return self.cache.get(self._make_key(key))
+
+    def set(self, key: str, content: bytes):
+        self.cache.set(self._make_key(key), content, self.timeout)
+
+    def _make_key(self, key):
+        return f'{self.key_prefix}:{key}'
+
+
+class FileLRUExportCache(ExportCache):
+    """
+    Stores export results as files in directory
+
+    When total size of files exceeds max_size (bytes) least recently used files are removed.
+    Modification time of file is used as time of last usage
+    """
+    suffix = '.export'
+
+    def __init__(self, directory, max_size=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key: str):
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+
+        self._touch(path)
+        return content
+
+    def set(self, key: str, content: bytes):
+        if len(content) > self.max_size:
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, self._get_path(key))
+        self.evict()
+
+    def evict(self):
+        """Removes least recently used files until cache fits max_size"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.suffix):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, f'{key}{self.suffix}')
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,43 @@
+from django.core.cache import caches
+from django.db.models import Count, Max
+
+
+class MaxFieldVersion(object):
+    """
+    Data version token built from max value of field (e.g. updated_at)
+    and number of objects in queryset, so deletions change version as well
+    """
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+
+    def __call__(self, qs):
+        result = qs.order_by().aggregate(
+            version=Max(self.field_name),
+            count=Count('pk'),
+        )
+        return f'{result["version"]}:{result["count"]}'
+
+
+class CounterVersion(object):
+    """
+    Data version token stored as counter in django cache
+
+    Counter should be increased with `bump` every time exported data changes, e.g. in signals
+    """
+
+    def __init__(self, key: str, alias='default'):
+        self.key = f'cronista:version:{key}'
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def __call__(self, qs):
+        self.cache.add(self.key, 0, None)
+        return self.cache.get(self.key)
+
+    def bump(self):
+        self.cache.add(self.key, 0, None)
+        return self.cache.incr(self.key)
@@ -0,0 +1,5 @@
+from cronista.csv.exporter import CsvModelExporter
+
+__all__ = [
+    'CsvModelExporter',
+]
@@ -0,0 +1,6 @@
+from cronista.base.model import ModelExporterWriter
+from cronista.csv.writer import CsvWriter
+
+
+class CsvModelExporter(ModelExporterWriter):
+    writer_class = CsvWriter
@@ -0,0 +1,98 @@
+import csv
+import io
+from urllib.parse import quote
+
+from django.http import HttpResponse
+
+from cronista.base import ExporterWriter
+
+
+class CsvWriter(ExporterWriter):
+    """
+    Keeps written cells in memory as {row: {col: value}} and renders them as csv on save
+
+    Merging and freezing have no meaning in csv, so they are ignored
+    """
+    default_value = ''
+    extension = 'csv'
+    encoding = 'utf-8'
+
+    def __init__(self):
+        super().__init__()
+        self.rows = {}
+        self.binary = None
+
+    def write(self, x, y, value):
+        value = value or self.default_value
+        self.rows.setdefault(y, {})[x] = str(value)
+
+    def write_row(self, y, x_start, values):
+        default_value = self.default_value
+        self.rows.setdefault(y, {}).update(
+            (x, str(value or default_value))
+            for x, value in enumerate(values, x_start)
+        )
+
+    def move_left(self, x_from, steps):
+        for y, row in self.rows.items():
+            if not any(x >= x_from for x in row):
+                continue
+            self.rows[y] = {
+                x + steps if x >= x_from else x: value
+                for x, value in row.items()
+            }
+
+    def duplicate_range(self, min_col, min_row, max_col, max_row, row_shift=0, col_shift=0):
+        if max_col is None:
+            max_col = self.max_column
+
+        for y in range(min_row, max_row + 1):
+            row = self.rows.get(y, {})
+            for x, value in list(row.items()):
+                if not min_col <= x <= max_col or not value:
+                    continue
+
+                self.write(x=x + col_shift, y=y + row_shift, value=value)
+
+    def merge_range(self, min_col, min_row, max_col, max_row):
+        pass
+
+    def freeze_panes(self, col, row):
+        pass
+
+    @property
+    def max_column(self):
+        return max((max(row) for row in self.rows.values() if row), default=0)
+
+    def to_text(self):
+        stream = io.StringIO()
+        writer = csv.writer(stream)
+        max_column = self.max_column
+        max_row = max(self.rows, default=0)
+        for y in range(1, max_row + 1):
+            row = self.rows.get(y, {})
+            writer.writerow([row.get(x, self.default_value) for x in range(1, max_column + 1)])
+
+        return stream.getvalue()
+
+    def to_file(self, filename='export'):
+        with open(filename, 'wb') as f:
+            f.write(self.to_binary())
+
+    def to_binary(self):
+        if self.binary is not None:
+            return self.binary
+
+        return self.to_text().encode(self.encoding)
+
+    def load_binary(self, content: bytes):
+        self.binary = content
+
+    def to_response(self, filename='export'):
+        filename = quote('{}.csv'.format(filename))
+        response = HttpResponse(
+            content=self.to_binary(),
+            content_type=f'text/csv; charset={self.encoding}'
+        )
+        response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
+        return response
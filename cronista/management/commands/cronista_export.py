@@ -0,0 +1,104 @@
+import argparse
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from cronista.base.memory import MemoryLimitExceeded
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'should be positive, got {value}')
+    return number
+
+
+class Command(BaseCommand):
+    help = 'Exports objects with exporter class into file, optionally profiling cpu time and memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('exporter', help='Dotted path to exporter class, e.g. shop.exporter.ShopExporter')
+        parser.add_argument('-o', '--output', required=True, help='Path of output file')
+        parser.add_argument(
+            '-f', '--filter', action='append', default=[], dest='filters', metavar='LOOKUP=VALUE',
+            help='Queryset filter, may be used several times',
+        )
+        parser.add_argument('--chunk-size', type=positive_int, default=None, help='Number of root objects read at once')
+        parser.add_argument(
+            '--memory-limit', type=float, default=None, metavar='MIB',
+            help='Memory limit of export in MiB, export adapts chunk size to it, requires chunks',
+        )
+        parser.add_argument('--profile', action='store_true', help='Profile export with cProfile')
+        parser.add_argument('--memory', action='store_true', help='Trace memory allocations with tracemalloc')
+        parser.add_argument('--top', type=int, default=20, help='Number of hot spots to print')
+
+    def handle(self, *args, **options):
+        try:
+            exporter_class = import_string(options['exporter'])
+        except ImportError as e:
+            raise CommandError(f'Could not import exporter: {e}')
+
+        qs = exporter_class.model_reader.model._default_manager.filter(**self.parse_filters(options['filters']))
+
+        exporter = exporter_class()
+        if options['chunk_size'] is not None:
+            exporter.chunk_size = options['chunk_size']
+        if options['memory_limit'] is not None:
+            exporter.memory_limit = int(options['memory_limit'] * 1024 * 1024)
+
+        profiler = cProfile.Profile() if options['profile'] else None
+        if options['memory']:
+            tracemalloc.start()
+
+        started = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+
+        try:
+            exporter.export(qs)
+        except MemoryLimitExceeded as e:
+            raise CommandError(str(e))
+        exporter.as_file(options['output'])
+
+        if profiler is not None:
+            profiler.disable()
+        duration = time.perf_counter() - started
+
+        self.stdout.write(f'Exported to {options["output"]} in {duration:.2f}s')
+
+        if profiler is not None:
+            self.write_profile(profiler, options['top'])
+
+        if options['memory']:
+            self.write_memory(options['top'])
+            tracemalloc.stop()
+
+    @staticmethod
+    def parse_filters(filters):
+        parsed = {}
+        for item in filters:
+            lookup, sep, value = item.partition('=')
+            if not sep or not lookup:
+                raise CommandError(f'Filter "{item}" should be in format LOOKUP=VALUE')
+            parsed[lookup] = value
+
+        return parsed
+
+    def write_profile(self, profiler: cProfile.Profile, top: int):
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats('cumulative').print_stats(top)
+        self.stdout.write(stream.getvalue())
+
+    def write_memory(self, top: int):
+        current, peak = tracemalloc.get_traced_memory()
+        self.stdout.write(f'Peak memory: {peak / 1024 / 1024:.2f} MiB, current: {current / 1024 / 1024:.2f} MiB')
+
+        snapshot = tracemalloc.take_snapshot()
+        for stat in snapshot.statistics('lineno')[:top]:
+            self.stdout.write(str(stat))
@@ -1,25 +1,127 @@
-from django.db import models
+import datetime
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import attrgetter
+from typing import NamedTuple
+
+import django
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist, ValidationError
+from django.db import models, connections, transaction, DEFAULT_DB_ALIAS
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models import Count, F, Max, Prefetch, QuerySet, Sum, Value, Window, prefetch_related_objects
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, RowNumber
 
 from cronista.base import ModelReader
 
 
+def get_generic_field_classes():
+    """
+    Returns GenericForeignKey and GenericRelation classes,
+    they can't be imported if contenttypes app is not installed
+    """
+    if not apps.is_installed('django.contrib.contenttypes'):
+        return (), ()
+
+    from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+    return GenericForeignKey, GenericRelation
+
+
+class Annotation(object):
+    """
+    Computed field of exporter: ORM expression (F, Sum, Subquery, Concat, ...)
+    attached to queryset and read as plain field
+    """
+
+    def __init__(self, expression, verbose_name: str):
+        self.expression = expression
+        self.verbose_name = verbose_name
+
+
+class PerParentLimit(NamedTuple):
+    partition_by: list
+    order_by: list
+    limit: int
+    row_number_name: str
+
+
+class PerParentLimitMixin(object):
+    """
+    Queryset keeping only first `limit` objects per parent, used for prefetches on Django < 4.2
+
+    Objects are filtered by subquery numbering rows in partitions of parent fk.
+    Subquery is built when queryset is evaluated from its final filters,
+    which include filter by parents added by related manager during prefetch,
+    so only related objects of prefetched parents are numbered
+    """
+    per_parent_limit: PerParentLimit = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone.per_parent_limit = self.per_parent_limit
+        return clone
+
+    def _fetch_all(self):
+        if self._result_cache is None and self.per_parent_limit is not None:
+            self._result_cache = list(self._apply_per_parent_limit())
+            self._prefetch_done = True
+        super()._fetch_all()
+
+    def _apply_per_parent_limit(self):
+        partition_by, order_by, limit, row_number_name = self.per_parent_limit
+        qs = self._chain()
+        qs.per_parent_limit = None
+
+        window_qs = qs.prefetch_related(None).order_by().annotate(**{
+            row_number_name: Window(expression=RowNumber(), partition_by=partition_by, order_by=order_by),
+        }).values('pk', row_number_name)
+
+        sql, params = window_qs.query.get_compiler(using=qs.db).as_sql()
+        quote_name = connections[qs.db].ops.quote_name
+        limited_sql = (
+            f'SELECT {quote_name(qs.model._meta.pk.column)} FROM ({sql}) cronista_window '
+            f'WHERE {quote_name(row_number_name)} <= %s'
+        )
+        return qs.filter(pk__in=RawSQL(limited_sql, (*params, limit)))
+
+
+@lru_cache(maxsize=None)
+def get_per_parent_limit_class(queryset_class):
+    """Returns subclass of queryset_class (e.g. custom queryset of manager) limiting objects per parent"""
+    return type(f'PerParentLimit{queryset_class.__name__}', (PerParentLimitMixin, queryset_class), {})
+
+
 class DjangoModelReader(ModelReader):
+    """
+    Fields may be lookups through single related objects, e.g. `shop__name` for product,
+    such related objects are joined to queryset with select_related
+    """
+    row_number_name = 'cronista_row_number'
 
     def get_field_name(self, field_name: str):
-        field = self._get_model_field(field_name)
-        if isinstance(field, models.ManyToOneRel):
-            return field.related_model._meta.verbose_name_plural
+        path = self.get_field_path(field_name)
+        if len(path) == 1:
+            return self._get_verbose_name(path[0])
 
-        return field.verbose_name
+        return ' '.join(str(self._get_verbose_name(field)) for field in path)
 
     def get_field_value(self, obj, field_name: str):
+        field = self._find_model_field(field_name)
+        if LOOKUP_SEP in field_name:
+            *path, field_name = field_name.split(LOOKUP_SEP)
+            for name in path:
+                # missing related object (null foreign key, absent reverse one-to-one) gives empty value
+                obj = getattr(obj, name, None)
+                if obj is None:
+                    return None
+
         display_attr = f'get_{field_name}_display'
         is_choice = hasattr(obj, display_attr)
         if is_choice:
             return getattr(obj, display_attr)()
 
-        field = self._get_model_field(field_name)
-        value = getattr(obj, field_name)
+        value = getattr(obj, field_name)  # annotations are read as attributes
 
         if isinstance(field, models.DateField):
             if not value:
@@ -28,24 +130,310 @@ class DjangoModelReader(ModelReader):
 
         return value
 
+    def get_field_getter(self, field_name: str):
+        """Fields without choices and date formatting, as well as annotations, are read as plain attributes"""
+        field = self._find_model_field(field_name)
+        is_plain = (
+            type(self).get_field_value is DjangoModelReader.get_field_value and
+            LOOKUP_SEP not in field_name and
+            not hasattr(self.model, f'get_{field_name}_display') and
+            not isinstance(field, models.DateField)
+        )
+        if is_plain:
+            return attrgetter(field_name)
+
+        return super().get_field_getter(field_name)
+
+    def parse_field_value(self, field_name: str, value):
+        field = self._get_model_field(field_name)
+        if value is None or value == '':
+            # writers export None and all falsy values as empty cells
+            if field.null:
+                return None
+            if field.empty_strings_allowed:
+                return ''
+            try:
+                return field.to_python(0)
+            except ValidationError:
+                return None
+
+        if field.choices:
+            choices = {str(display): choice for choice, display in field.flatchoices}
+            if value in choices:
+                return choices[value]
+
+        if isinstance(field, models.DateField) and isinstance(value, str):
+            parsed = datetime.datetime.strptime(value, "%d.%m.%Y")
+            return parsed if isinstance(field, models.DateTimeField) else parsed.date()
+
+        return field.to_python(value)
+
     def get_related_field_value(self, obj, field_name: str):
         model_field = self._get_model_field(field_name)
-        is_m2o = isinstance(model_field, models.ManyToOneRel)  # related fks
+        generic_fk_class, generic_relation_class = get_generic_field_classes()
+        is_reverse_o2o = isinstance(model_field, models.OneToOneRel)
+        is_m2o = isinstance(model_field, models.ManyToOneRel) and not is_reverse_o2o  # related fks
         is_m2m = isinstance(model_field, models.ManyToManyField)
         is_o2o = isinstance(model_field, models.OneToOneField)
         is_fk = isinstance(model_field, models.ForeignKey)
+        is_generic_relation = isinstance(model_field, generic_relation_class)
+        is_generic_fk = isinstance(model_field, generic_fk_class)
 
-        if is_m2o or is_m2m:
+        if is_m2o or is_m2m or is_generic_relation:
             field = getattr(obj, field_name)
-            data = getattr(field, 'all')()
-        elif is_o2o or is_fk:
-            obj = getattr(obj, field_name)
-            data = [obj]  # fake qs
+            # read related objects from the same database as obj, even if router decides otherwise
+            data = field.db_manager(obj._state.db).all()
+        elif is_o2o or is_fk or is_reverse_o2o or is_generic_fk:
+            try:
+                obj = getattr(obj, field_name)
+            except ObjectDoesNotExist:
+                obj = None
+            data = [obj] if obj is not None else []  # fake qs
         else:
             raise ValueError(f'Field {field_name} of type {type(model_field)} is '
                              f'not supported by model reader {self.__class__.__name__}')
 
         return data
 
+    def get_chunk(self, objects, offset: int, limit: int, last=None) -> list:
+        """
+        Not ordered querysets are read by primary key pages (keyset pagination): every chunk is
+        one index range scan, and rows changed between chunks are neither skipped nor repeated.
+        Ordered querysets are read by offset to keep their ordering
+        """
+        if isinstance(objects, QuerySet) and not objects.ordered and not objects.query.is_sliced:
+            objects = objects.order_by('pk')
+            if last is not None:
+                objects = objects.filter(pk__gt=last.pk)
+            return list(objects[:limit])
+
+        return super().get_chunk(objects, offset, limit)
+
+    def requires_prefetch(self, field_name: str):
+        """
+        Reverse one-to-one and generic relations are always prefetched:
+        generic foreign keys are loaded by one query per content type for all objects
+        """
+        model_field = self._get_model_field(field_name)
+        return isinstance(model_field, (models.OneToOneRel, *get_generic_field_classes()))
+
+    def get_prefetch(self, field_name: str, exporter_class, using: str = None):
+        model_field = self._get_model_field(field_name)
+        generic_fk_class, _ = get_generic_field_classes()
+        if isinstance(model_field, generic_fk_class):
+            # related objects are of different models, so their queryset can't be customized
+            return field_name
+
+        qs = model_field.related_model._default_manager.all()
+        if using is not None:
+            qs = qs.using(using)
+
+        if exporter_class.ordering:
+            qs = qs.order_by(*exporter_class.ordering)
+
+        if exporter_class.annotations:
+            qs = exporter_class.model_reader.annotate(qs, exporter_class.annotations)
+
+        select_related = exporter_class.get_select_related()
+        if select_related:
+            qs = qs.select_related(*select_related)
+
+        nested = exporter_class.get_prefetches(using=using)
+        if nested:
+            qs = qs.prefetch_related(*nested)
+
+        if exporter_class.limit is not None:
+            qs = self._limit_per_parent(model_field, qs, exporter_class.limit)
+
+        return Prefetch(field_name, queryset=qs)
+
+    def get_select_related(self, field_names) -> list:
+        """
+        Returns paths of related objects of lookup fields and related objects exported as fields themselves,
+        all relations on the path must be single objects: forward or reverse one-to-one and foreign keys
+        """
+        lookups = []
+        for field_name in field_names:
+            path = self._find_field_path(field_name)
+            if path is None:
+                continue
+
+            *joins, last = path
+            if not all(self._is_single_relation(field) for field in joins):
+                raise ValueError(f'Field {field_name} of model reader {self.__class__.__name__} '
+                                 f'should follow only foreign keys and one-to-one relations')
+
+            if self._is_single_relation(last):
+                joins.append(last)
+            if joins:
+                lookups.append(LOOKUP_SEP.join(field.name for field in joins))
+
+        return list(dict.fromkeys(lookups))
+
+    def select_related(self, objects, lookups: list):
+        if isinstance(objects, QuerySet):
+            return objects.select_related(*lookups)
+
+        # related objects of not queryset objects are loaded by one query per relation
+        objects = list(objects)
+        prefetch_related_objects(objects, *lookups)
+        return objects
+
+    def prefetch_related(self, objects, prefetches: list):
+        if isinstance(objects, QuerySet):
+            return objects.prefetch_related(*prefetches)
+
+        objects = list(objects)
+        prefetch_related_objects(objects, *prefetches)
+        return objects
+
+    def get_lookup(self, field_name: str):
+        generic_fk_class, _ = get_generic_field_classes()
+        if isinstance(self._get_model_field(field_name), generic_fk_class):
+            return None
+
+        return field_name
+
+    def count_related(self, objects, row_lookups: list, column_lookups: list):
+        if not isinstance(objects, QuerySet):
+            objects = list(objects)
+            return len(objects), 0, {}
+
+        lookups = list(dict.fromkeys([*row_lookups, *column_lookups]))
+        names = {lookup: f'cronista_count_{i}' for i, lookup in enumerate(lookups)}
+        qs = objects.order_by().annotate(**{
+            names[lookup]: Count(lookup, distinct=True)
+            for lookup in lookups
+        })
+
+        aggregates = {'cronista_objects': Count('pk')}
+        for i, lookup in enumerate(row_lookups):
+            aggregates[f'cronista_rows_{i}'] = Sum(Greatest(F(names[lookup]) - 1, Value(0)))
+        for i, lookup in enumerate(column_lookups):
+            aggregates[f'cronista_max_{i}'] = Max(names[lookup])
+
+        result = qs.aggregate(**aggregates)
+        extra_rows = sum(result[f'cronista_rows_{i}'] or 0 for i in range(len(row_lookups)))
+        max_counts = {lookup: result[f'cronista_max_{i}'] or 0 for i, lookup in enumerate(column_lookups)}
+        return result['cronista_objects'], extra_rows, max_counts
+
+    def annotate(self, objects, annotations: dict):
+        if not isinstance(objects, QuerySet):
+            raise ValueError(f'Annotations {", ".join(annotations)} can be attached only to queryset')
+
+        return objects.annotate(**{name: annotation.expression for name, annotation in annotations.items()})
+
+    def use_database(self, objects, using: str):
+        if isinstance(objects, QuerySet):
+            return objects.using(using)
+
+        return objects
+
+    @contextmanager
+    def snapshot(self, objects):
+        """
+        Runs reads in one transaction, on PostgreSQL with repeatable read isolation
+        as default read committed level gives every query its own snapshot
+        """
+        using = objects.db if isinstance(objects, QuerySet) else DEFAULT_DB_ALIAS
+        connection = connections[using]
+        outermost = not connection.in_atomic_block
+        with transaction.atomic(using=using):
+            if outermost and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+            yield
+
+    def _limit_per_parent(self, model_field, qs: QuerySet, limit: int):
+        """
+        Limits related objects to first `limit` objects per parent object
+
+        Django >= 4.2 supports sliced prefetch querysets natively (using window function),
+        older versions are limited by PerParentLimitMixin
+        """
+        _, generic_relation_class = get_generic_field_classes()
+        related_model = model_field.related_model
+        if isinstance(model_field, generic_relation_class):
+            content_type_field = related_model._meta.get_field(model_field.content_type_field_name)
+            partition_by = [F(content_type_field.attname), F(model_field.object_id_field_name)]
+        elif isinstance(model_field, models.ManyToOneRel) and not isinstance(model_field, models.OneToOneRel):
+            partition_by = [F(model_field.field.attname)]
+        else:
+            raise ValueError(f'Limit of field {model_field.name} of type {type(model_field)} is '
+                             f'not supported by model reader {self.__class__.__name__}')
+
+        if django.VERSION >= (4, 2):
+            return qs[:limit]
+
+        ordering = list(qs.query.order_by or related_model._meta.ordering) + ['pk']
+        limited = qs._chain()
+        limited.__class__ = get_per_parent_limit_class(qs.__class__)
+        limited.per_parent_limit = PerParentLimit(
+            partition_by=partition_by,
+            order_by=[self._get_order_expression(o) for o in ordering],
+            limit=limit,
+            row_number_name=self.row_number_name,
+        )
+        return limited
+
+    @staticmethod
+    def _get_order_expression(ordering):
+        if not isinstance(ordering, str):
+            return ordering
+
+        if ordering.startswith('-'):
+            return F(ordering[1:]).desc()
+
+        return F(ordering).asc()
+
+    def get_field_path(self, field_name: str) -> list:
+        """Returns model fields along `__` separated lookup"""
+        model = self.model
+        path = []
+        for name in field_name.split(LOOKUP_SEP):
+            if model is None:
+                raise FieldDoesNotExist(f'Lookup {field_name} follows field {path[-1].name} which is not relation')
+
+            field = model._meta.get_field(name)
+            path.append(field)
+            model = field.related_model
+
+        return path
+
+    @staticmethod
+    def _get_verbose_name(field):
+        if isinstance(field, models.OneToOneRel):
+            return field.related_model._meta.verbose_name
+
+        if isinstance(field, models.ManyToOneRel):
+            return field.related_model._meta.verbose_name_plural
+
+        return getattr(field, 'verbose_name', None) or field.name
+
+    @staticmethod
+    def _is_single_relation(field):
+        """Foreign keys and one-to-one relations, which can be joined by select_related"""
+        generic_fk_class, _ = get_generic_field_classes()
+        if not field.is_relation or isinstance(field, generic_fk_class):
+            return False
+
+        return bool(field.many_to_one or field.one_to_one)
+
     def _get_model_field(self, field_name):
+        if LOOKUP_SEP in field_name:
+            return self.get_field_path(field_name)[-1]
+
         return self.model._meta.get_field(field_name)
+
+    def _find_model_field(self, field_name):
+        """Returns model field or None for attributes which are not fields, e.g. annotations"""
+        try:
+            return self._get_model_field(field_name)
+        except FieldDoesNotExist:
+            return None
+
+    def _find_field_path(self, field_name):
+        try:
+            return self.get_field_path(field_name)
+        except FieldDoesNotExist:
+            return None
@@ -0,0 +1,115 @@
+import dataclasses
+from operator import attrgetter
+
+from cronista.base import ModelReader
+
+
+def get_attrs_module():
+    """Returns attrs module or None if it is not installed"""
+    try:
+        import attr
+    except ImportError:
+        return None
+
+    return attr
+
+
+def humanize(field_name: str):
+    return field_name.replace('_', ' ').title()
+
+
+def follow_lookup(obj, lookup: str) -> list:
+    """Returns related objects of obj reached by attributes (keys of dicts) of lookup, e.g. products__properties"""
+    objects = [obj]
+    for name in lookup.split('__'):
+        related = []
+        for value in objects:
+            value = value.get(name) if isinstance(value, dict) else getattr(value, name, None)
+            if value is None:
+                continue
+
+            if isinstance(value, (list, tuple, set)):
+                related.extend(value)
+            else:
+                related.append(value)
+        objects = related
+
+    return objects
+
+
+class ObjectReader(ModelReader):
+    """
+    Reads attributes of python objects: instances of dataclasses or attrs classes
+
+    Fields of other classes are not declared, so they raise ValueError,
+    subclasses may support them by overriding get_titles.
+    Titles of fields are taken from `title` in metadata of dataclass and attrs fields,
+    attribute getters of all fields are prepared once in constructor.
+    Related objects are lists (tuples, sets) of objects or single objects, they are in memory,
+    so prefetches are not needed and they are counted in memory to estimate size of export
+    """
+
+    def __init__(self, model=None):
+        super().__init__(model)
+        self.titles = self.get_titles()
+        self.getters = {field_name: self.make_getter(field_name) for field_name in self.titles}
+
+    def get_titles(self) -> dict:
+        """Returns {field name: title} for fields of model"""
+        if dataclasses.is_dataclass(self.model):
+            return {
+                field.name: field.metadata.get('title') or humanize(field.name)
+                for field in dataclasses.fields(self.model)
+            }
+
+        attr = get_attrs_module()
+        if attr is not None and attr.has(self.model):
+            return {
+                field.name: field.metadata.get('title') or humanize(field.name)
+                for field in attr.fields(self.model)
+            }
+
+        raise ValueError(f'Fields of {self.model} can not be read by {self.__class__.__name__}')
+
+    def make_getter(self, field_name: str):
+        return attrgetter(field_name)
+
+    def get_field_name(self, field_name: str):
+        return self.titles[field_name]
+
+    def get_field_value(self, obj, field_name: str):
+        return self.getters[field_name](obj)
+
+    def get_field_getter(self, field_name: str):
+        return self.getters[field_name]
+
+    def get_related_field_value(self, obj, field_name: str):
+        value = self.get_field_value(obj, field_name)
+        if value is None:
+            return []
+
+        if isinstance(value, (list, tuple, set)):
+            return list(value)
+
+        return [value]
+
+    def get_prefetch(self, field_name: str, exporter_class, using: str = None):
+        return field_name
+
+    def prefetch_related(self, objects, prefetches: list):
+        return objects
+
+    def get_lookup(self, field_name: str):
+        return field_name
+
+    def count_related(self, objects, row_lookups: list, column_lookups: list):
+        objects = list(objects)
+        extra_rows = 0
+        max_counts = dict.fromkeys(column_lookups, 0)
+        for obj in objects:
+            for lookup in row_lookups:
+                extra_rows += max(len(follow_lookup(obj, lookup)) - 1, 0)
+            for lookup in column_lookups:
+                max_counts[lookup] = max(max_counts[lookup], len(follow_lookup(obj, lookup)))
+
+        return len(objects), extra_rows, max_counts
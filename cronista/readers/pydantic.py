@@ -1,33 +1,36 @@
-from pydantic.fields import ModelField
+from pydantic import BaseModel, PydanticUserError
 
-from cronista.base import ModelReader
+from cronista.readers.objects import ObjectReader, humanize
 
 
-class PydanticModelReader(ModelReader):
+class PydanticModelReader(ObjectReader):
+    """
+    Reads pydantic v2 model instances or dicts of their data
 
-    def get_field_name(self, field_name: str):
-        return self._get_model_field(field_name).field_info.title
+    Titles of fields are taken from json schema of model, so they are the same as in api docs
+    """
 
-    def get_field_value(self, obj, field_name: str):
-        try:
-            return obj[field_name]
-        except KeyError:
-            return None
+    def get_titles(self) -> dict:
+        if not (isinstance(self.model, type) and issubclass(self.model, BaseModel)):
+            raise ValueError(f'{self.model} is not pydantic model')
 
-    def get_related_field_value(self, obj, field_name: str):
-        value = self.get_field_value(obj, field_name)
+        try:
+            properties = self.model.model_json_schema().get('properties', {})
+        except PydanticUserError:
+            # types without json schema, titles are taken from fields
+            properties = {}
 
-        is_list = isinstance(value, list)
-        is_dict = isinstance(value, dict)
+        return {
+            field_name: properties.get(field_name, {}).get('title') or field.title or humanize(field_name)
+            for field_name, field in self.model.model_fields.items()
+        }
 
-        if is_list:
-            data = value
-        elif is_dict:
-            data = [value]
-        else:
-            raise ValueError(f'Field {field_name} is not supported by model reader {self.__class__.__name__}')
+    def make_getter(self, field_name: str):
+        get_attr = super().make_getter(field_name)
 
-        return data
+        def getter(obj):
+            if isinstance(obj, dict):
+                return obj.get(field_name)
+            return get_attr(obj)
 
-    def _get_model_field(self, field_name) -> ModelField:
-        return self.model.__fields__[field_name]
+        return getter
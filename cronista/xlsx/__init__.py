@@ -1,5 +1,7 @@
 from cronista.xlsx.exporter import XlsxModelExporter
+from cronista.xlsx.importer import XlsxModelImporter
 
 __all__ = [
     'XlsxModelExporter',
+    'XlsxModelImporter',
 ]
@@ -0,0 +1,327 @@
+from typing import Dict, List
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models, router, transaction
+from openpyxl import load_workbook
+
+from cronista.base import ModelExporter
+
+
+def get_cell(row: tuple, col: int):
+    """Returns value of 1-based column of row or None if row is shorter"""
+    if col - 1 < len(row):
+        return row[col - 1]
+    return None
+
+
+class ExporterLayout(object):
+    """
+    Columns occupied in file by one exporter object: its fields and objects of related exporters
+    """
+
+    def __init__(self, exporter_class: type(ModelExporter)):
+        self.exporter_class = exporter_class
+        self.fields: Dict[str, int] = {}
+        self.related: Dict[str, List['ExporterLayout']] = {}
+
+
+class ImportRecord(object):
+    """
+    Raw values of one object read from file together with its related records
+    """
+
+    def __init__(self, exporter_class: type(ModelExporter), values: dict, parent: 'ImportRecord' = None):
+        self.exporter_class = exporter_class
+        self.values = values
+        self.parent = parent
+        self.related: Dict[str, List['ImportRecord']] = {}
+        self.instance = None
+
+    def is_empty(self):
+        has_values = any(value not in (None, '') for value in self.values.values())
+        return not has_values and not any(self.related.values())
+
+
+class XlsxModelImporter(object):
+    """
+    Imports xlsx file produced by exporter_class back into models
+
+    Layout of file is restored from header rows using exporter fields, related and state.
+    Object of exporter without vertical related exporters takes one row, object of horizontal
+    exporter takes all rows of its parent. Other objects take as many rows as their vertical
+    related objects with values of their fields duplicated on every row, so distinct objects
+    with equal values can be told apart only by primary key, which has to be among their fields.
+    Cells of a related object are copied onto rows of longer vertical exporters placed after it,
+    so such rows repeating values of the previous row are read as the same object.
+    File is read in read-only streaming mode and objects are saved by batches
+    of batch_size root objects with bulk_create/bulk_update per related model.
+
+    Objects with primary key of existing object are updated, others are created.
+    Related objects of updated objects are matched by their primary key too,
+    so it has to be among fields of related exporters as well.
+    Only reverse foreign keys (related_name of ForeignKey/OneToOneField) can be imported as related
+    """
+
+    def __init__(self, exporter_class: type(ModelExporter), batch_size=1000, using=None):
+        self.exporter_class = exporter_class
+        self.batch_size = batch_size
+        self.using = using
+
+    def import_file(self, file):
+        """
+        :param file: path or file-like object of xlsx file
+        Returns number of imported root objects
+        """
+        wb = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [next(rows, ()) for _ in range(self.exporter_class.get_depth())]
+            layout = self.parse_layout(header)
+
+            count = 0
+            batch = []
+            for group in self.group_rows(layout, rows):
+                batch.extend(self.read_records(layout, group))
+                if len(batch) >= self.batch_size:
+                    self.save(batch)
+                    count += len(batch)
+                    batch = []
+
+            if batch:
+                self.save(batch)
+                count += len(batch)
+        finally:
+            wb.close()
+
+        return count
+
+    def parse_layout(self, header: List[tuple]) -> ExporterLayout:
+        width = max((len(row) for row in header), default=0)
+        layouts = self._parse_layouts(self.exporter_class, header, 0, 1, width)
+        if len(layouts) != 1:
+            raise ValueError(f'Header does not match exporter {self.exporter_class.__name__}')
+
+        return layouts[0]
+
+    def _parse_layouts(self, exporter_class: type(ModelExporter), header: List[tuple], row_index: int,
+                       col_start: int, col_end: int) -> List[ExporterLayout]:
+        """
+        Splits header cells of row between col_start and col_end into objects of exporter_class
+
+        Every exporter object writes into its header row names of fields, followed by names of related
+        fields, the latter are merged over all columns of related exporters. So non-empty cells of
+        the row are consecutive groups of len(fields) + len(related) names
+        """
+        row = header[row_index]
+        names = list(exporter_class.fields) + list(exporter_class.related)
+        tokens = [col for col in range(col_start, col_end + 1) if get_cell(row, col) not in (None, '')]
+        if not tokens or len(tokens) % len(names):
+            raise ValueError(f'Header in row {row_index + 1} does not match exporter {exporter_class.__name__}')
+
+        layouts = []
+        for i in range(0, len(tokens), len(names)):
+            instance_tokens = tokens[i:i + len(names)]
+            next_instance = i + len(names)
+            instance_end = tokens[next_instance] - 1 if next_instance < len(tokens) else col_end
+
+            layout = ExporterLayout(exporter_class)
+            for j, (name, col) in enumerate(zip(names, instance_tokens)):
+                expected = str(exporter_class.get_field_name(name))
+                if str(get_cell(row, col)) != expected:
+                    raise ValueError(f'Expected "{expected}" in row {row_index + 1}, column {col}, '
+                                     f'got "{get_cell(row, col)}"')
+
+                if name not in exporter_class.related:
+                    layout.fields[name] = col
+                    continue
+
+                related_class = exporter_class.related[name]
+                end = instance_tokens[j + 1] - 1 if j + 1 < len(instance_tokens) else instance_end
+                layout.related[name] = self._parse_layouts(related_class, header, row_index + 1, col, end)
+                if related_class.state == ModelExporter.VERTICAL and len(layout.related[name]) != 1:
+                    raise ValueError(f'Vertical exporter {related_class.__name__} is placed several times')
+
+            layouts.append(layout)
+
+        return layouts
+
+    def group_rows(self, layout: ExporterLayout, rows, duplicated=False):
+        """
+        Yields lists of rows of objects of vertically placed layout
+
+        duplicated - cells of layout may be copied onto next rows by a longer vertical exporter
+            placed after it, then a row repeating values of the previous row is the same object
+        """
+        if not self.spans_rows(layout.exporter_class):
+            group, group_values = [], None
+            for row in rows:
+                values = tuple(get_cell(row, col) for col in layout.fields.values())
+                if group and not (duplicated and values == group_values):
+                    yield group
+                    group = []
+
+                group_values = values
+                group.append(row)
+
+            if group:
+                yield group
+            return
+
+        pk_col = layout.fields.get(layout.exporter_class.model_reader.model._meta.pk.name)
+        if pk_col is None:
+            raise ValueError(f'Objects of {layout.exporter_class.__name__} take several rows, '
+                             f'primary key should be among its fields to tell them apart')
+
+        group, group_pk = [], None
+        for row in rows:
+            pk = get_cell(row, pk_col)
+            if pk in (None, ''):
+                if any(get_cell(row, col) not in (None, '') for col in layout.fields.values()):
+                    raise ValueError(f'Object of {layout.exporter_class.__name__} without primary key '
+                                     f'can not be told apart from other objects')
+                # rows below the last related object of a shorter vertical exporter
+                pk = group_pk
+
+            if group and pk != group_pk:
+                yield group
+                group = []
+
+            group_pk = pk
+            group.append(row)
+
+        if group:
+            yield group
+
+    @classmethod
+    def spans_rows(cls, exporter_class: type(ModelExporter)):
+        """Returns True if object of exporter class can take several rows"""
+        return any(
+            related_class.state == ModelExporter.VERTICAL or cls.spans_rows(related_class)
+            for related_class in exporter_class.related.values()
+        )
+
+    def read_records(self, layout: ExporterLayout, rows: List[tuple], parent: ImportRecord = None,
+                     duplicated=False):
+        if parent is not None and layout.exporter_class.state == ModelExporter.HORIZONTAL:
+            groups = [rows]
+        else:
+            groups = self.group_rows(layout, rows, duplicated=duplicated)
+
+        related = list(layout.exporter_class.related.items())
+        records = []
+        for group in groups:
+            values = {name: get_cell(group[0], col) for name, col in layout.fields.items()}
+            record = ImportRecord(layout.exporter_class, values, parent=parent)
+            for i, (name, related_class) in enumerate(related):
+                # exporters placed after related one copy its cells onto the rows they take below it
+                related_duplicated = duplicated or any(
+                    next_class.state == ModelExporter.VERTICAL or self.spans_rows(next_class)
+                    for _, next_class in related[i + 1:]
+                )
+                record.related[name] = [
+                    child
+                    for instance in layout.related[name]
+                    for child in self.read_records(instance, group, parent=record, duplicated=related_duplicated)
+                ]
+
+            if not record.is_empty():
+                records.append(record)
+
+        return records
+
+    def save(self, records: List[ImportRecord]):
+        model = self.exporter_class.model_reader.model
+        using = self.using or router.db_for_write(model)
+        with transaction.atomic(using=using):
+            self._save_records(self.exporter_class, records, using)
+
+    def _save_records(self, exporter_class: type(ModelExporter), records: List[ImportRecord], using: str,
+                      parent_field: str = None):
+        """
+        Saves records of one exporter class, then all their related records level by level
+        """
+        reader = exporter_class.model_reader
+        model = reader.model
+        pk_name = model._meta.pk.name
+        fields = self.get_import_fields(exporter_class)
+        manager = model._default_manager.db_manager(using)
+
+        for record in records:
+            values = {
+                name: reader.parse_field_value(name, record.values[name])
+                for name in fields
+                if not (name == pk_name and record.values[name] in (None, ''))
+            }
+            record.instance = model(**values)
+            if parent_field is not None:
+                setattr(record.instance, parent_field, record.parent.instance)
+
+        existing = self.get_existing_pks(manager, [record.instance.pk for record in records
+                                                   if record.instance.pk is not None])
+        creates, updates = [], []
+        for record in records:
+            if record.instance.pk in existing:
+                updates.append(record.instance)
+                self.check_related_pks(exporter_class, record)
+            else:
+                creates.append(record.instance)
+
+        if creates:
+            returns_pks = connections[using].features.can_return_rows_from_bulk_insert
+            if exporter_class.related and not returns_pks:
+                # related objects need primary keys, which bulk_create does not set on this database
+                for instance in creates:
+                    instance.save(using=using, force_insert=True)
+            else:
+                manager.bulk_create(creates, batch_size=self.batch_size)
+
+        update_fields = [name for name in fields if name != pk_name]
+        if updates and update_fields:
+            manager.bulk_update(updates, update_fields, batch_size=self.batch_size)
+
+        for name, related_class in exporter_class.related.items():
+            children = [child for record in records for child in record.related.get(name, [])]
+            if children:
+                self._save_records(related_class, children, using, parent_field=self.get_parent_field(model, name))
+
+    def get_existing_pks(self, manager, pks: list) -> set:
+        """Returns primary keys of objects already saved in database"""
+        existing = set()
+        for i in range(0, len(pks), self.batch_size):
+            existing.update(manager.filter(pk__in=pks[i:i + self.batch_size]).values_list('pk', flat=True))
+        return existing
+
+    def check_related_pks(self, exporter_class: type(ModelExporter), record: ImportRecord):
+        """Refuses to import related records of existing object which could not be matched by primary key"""
+        for name, related_class in exporter_class.related.items():
+            related_pk = related_class.model_reader.model._meta.pk.name
+            if record.related.get(name) and related_pk not in self.get_import_fields(related_class):
+                raise ValueError(
+                    f'Objects of {related_class.__name__} related to existing objects of '
+                    f'{exporter_class.__name__} can not be matched without primary key among its fields'
+                )
+
+    @staticmethod
+    def get_import_fields(exporter_class: type(ModelExporter)):
+        """Returns exporter fields which are concrete not relational model fields"""
+        model = exporter_class.model_reader.model
+        fields = []
+        for name in exporter_class.fields:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+
+            if field.concrete and not field.is_relation:
+                fields.append(name)
+
+        return fields
+
+    @staticmethod
+    def get_parent_field(model, field_name: str):
+        """Returns name of foreign key of related model pointing to parent model"""
+        field = model._meta.get_field(field_name)
+        if not isinstance(field, models.ManyToOneRel):
+            raise ValueError(f'Field {field_name} of type {type(field)} is not supported by importer')
+
+        return field.field.name
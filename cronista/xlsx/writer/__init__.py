@@ -1,5 +1,7 @@
 from cronista.xlsx.writer.openpyxl import OpenPyXlWriter
+from cronista.xlsx.writer.mapped import MappedOpenPyXlWriter
 
 __all__ = [
-    'OpenPyXlWriter'
+    'OpenPyXlWriter',
+    'MappedOpenPyXlWriter',
 ]
@@ -0,0 +1,210 @@
+import heapq
+import io
+import os
+import pickle
+import tempfile
+from itertools import count, groupby
+from operator import itemgetter
+from typing import Dict, List
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+
+from cronista.xlsx.writer.openpyxl import OpenPyXlWriter
+
+
+class MappedOpenPyXlWriter(OpenPyXlWriter):
+    """
+    Writer keeping cells by logical column ids instead of physical columns
+
+    Physical order of columns is a list of ids, so inserting space with move_left
+    only inserts new ids into the list and never moves written cells:
+    its cost does not depend on number of written rows.
+    Cells are placed on their final coordinates once, when workbook is requested for saving.
+    Widths of autosized columns are tracked by column ids as well.
+
+    Written rows can be spilled into temporary file by release_memory: rows of exported objects
+    are never changed later, since moving columns only changes list of ids.
+    File is saved by streaming rows in their order into write only workbook,
+    so spilled rows are read back one by one and all cells are never kept in memory at once
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.columns: List[int] = []
+        self.cells: Dict[int, Dict[int, str]] = {}
+        self.merged = []
+        self.frozen = None
+        self.spill = None
+        self.batches = []
+        self._ids = count()
+
+    def ensure_columns(self, number):
+        """Creates ids for new columns up to physical column number"""
+        while len(self.columns) < number:
+            self.columns.append(next(self._ids))
+
+    def get_column_id(self, x):
+        """Returns id of physical column x"""
+        self.ensure_columns(x)
+        return self.columns[x - 1]
+
+    def write(self, x, y, value):
+        value = str(value or self.default_value)
+        column_id = self.get_column_id(x)
+        self.cells.setdefault(y, {})[column_id] = value
+        if self.autosize_columns:
+            self.track_width(column_id, value)
+
+    def write_row(self, y, x_start, values):
+        values = list(values)
+        self.ensure_columns(x_start + len(values) - 1)
+        default_value = self.default_value
+        row = [
+            (column_id, str(value or default_value))
+            for column_id, value in zip(self.columns[x_start - 1:], values)
+        ]
+        self.cells.setdefault(y, {}).update(row)
+        if self.autosize_columns:
+            for column_id, value in row:
+                self.track_width(column_id, value)
+
+    def move_left(self, x_from, steps):
+        self.ensure_columns(x_from - 1)
+        self.columns[x_from - 1:x_from - 1] = [next(self._ids) for _ in range(steps)]
+
+    def duplicate_range(self, min_col, min_row, max_col, max_row, row_shift=0, col_shift=0):
+        if max_col is None:
+            max_col = len(self.columns)
+
+        for y in range(min_row, max_row + 1):
+            row = self.cells.get(y)
+            if not row:
+                continue
+
+            for x in range(min_col, max_col + 1):
+                value = row.get(self.get_column_id(x))
+                if not value:
+                    continue
+
+                self.write(x=x + col_shift, y=y + row_shift, value=value)
+
+    def release_memory(self):
+        """Moves written rows into temporary file, they are read back when workbook is saved"""
+        if not self.cells:
+            return
+
+        if self.spill is None:
+            self.spill = tempfile.TemporaryFile()
+        self.spill.seek(0, os.SEEK_END)
+        start = self.spill.tell()
+        for y in sorted(self.cells):
+            pickle.dump((y, self.cells[y]), self.spill, protocol=pickle.HIGHEST_PROTOCOL)
+        self.batches.append((start, self.spill.tell()))
+        self.cells = {}
+
+    def iterate_batch(self, start, end):
+        """Yields rows (row, {column id: value}) spilled between positions start and end of file"""
+        position = start
+        while position < end:
+            self.spill.seek(position)
+            row = pickle.load(self.spill)
+            position = self.spill.tell()
+            yield row
+
+    def iterate_rows(self):
+        """
+        Yields rows (row, {column id: value}) in order of rows,
+        cells of the same row written after spilling overwrite spilled ones
+        """
+        batches = [self.iterate_batch(start, end) for start, end in self.batches]
+        batches.append((y, self.cells[y]) for y in sorted(self.cells))
+        for y, rows in groupby(heapq.merge(*batches, key=itemgetter(0)), key=itemgetter(0)):
+            cells = {}
+            for _, row in rows:
+                cells.update(row)
+            yield y, cells
+
+    def merge_range(self, min_col, min_row, max_col, max_row):
+        self.merged.append((self.get_column_id(min_col), min_row, self.get_column_id(max_col), max_row))
+
+    def freeze_panes(self, col, row):
+        self.frozen = (self.get_column_id(col), row)
+
+    def get_positions(self):
+        """Returns {column id: physical column}"""
+        return {column_id: x for x, column_id in enumerate(self.columns, 1)}
+
+    def get_workbook(self):
+        """Places all cells on their physical columns in new workbook kept in memory, e.g. to render html"""
+        self.wb = Workbook()
+        self.ws = self.wb.active
+        positions = self.get_positions()
+
+        cell = self.ws.cell
+        for y, cells in self.iterate_rows():
+            for column_id, value in cells.items():
+                cell(row=y, column=positions[column_id], value=value)
+
+        for min_id, min_row, max_id, max_row in self.merged:
+            super().merge_range(
+                min_col=positions[min_id],
+                min_row=min_row,
+                max_col=positions[max_id],
+                max_row=max_row,
+            )
+
+        if self.frozen is not None:
+            column_id, row = self.frozen
+            super().freeze_panes(col=positions[column_id], row=row)
+
+        self.set_widths({positions[column_id]: width for column_id, width in self.widths.items()})
+        return self.wb
+
+    def save_workbook(self, file):
+        """Streams rows in their order into write only workbook saved into file (path or file-like object)"""
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        positions = self.get_positions()
+
+        # dimensions and panes are written before rows, merged cells after them
+        self.set_widths({positions[column_id]: width for column_id, width in self.widths.items()}, ws=ws)
+        if self.frozen is not None:
+            column_id, row = self.frozen
+            ws.freeze_panes = f'{get_column_letter(positions[column_id])}{row}'
+        for min_id, min_row, max_id, max_row in self.merged:
+            ws.merged_cells.add(CellRange(
+                min_col=positions[min_id],
+                min_row=min_row,
+                max_col=positions[max_id],
+                max_row=max_row,
+            ))
+
+        last_row = 0
+        for y, cells in self.iterate_rows():
+            for _ in range(y - last_row - 1):
+                ws.append([])
+
+            values = [None] * len(self.columns)
+            for column_id, value in cells.items():
+                values[positions[column_id] - 1] = value
+            ws.append(values)
+            last_row = y
+
+        wb.save(file)
+
+    def to_file(self, filename='export'):
+        if self.binary is not None:
+            super().to_file(filename)
+            return
+
+        self.save_workbook(filename)
+
+    def to_binary(self):
+        if self.binary is not None:
+            return self.binary
+
+        buffer = io.BytesIO()
+        self.save_workbook(buffer)
+        return buffer.getvalue()
@@ -1,7 +1,10 @@
+from html import escape
+from typing import Dict
 from urllib.parse import quote
 
 from django.http import HttpResponse
 from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.writer.excel import save_virtual_workbook
 
@@ -9,19 +12,57 @@ from cronista.base import ExporterWriter
 
 
 class OpenPyXlWriter(ExporterWriter):
+    """
+    autosize_columns - fit widths of columns to the longest written values,
+    widths are tracked while writing and set once when workbook is saved
+    max_column_width - upper limit of fitted width
+    """
     default_value = ''
+    extension = 'xlsx'
+    autosize_columns = False
+    max_column_width = 60
 
     def __init__(self):
         super().__init__()
         self.wb = Workbook()
         self.ws = self.wb.active
+        self.binary = None
+        self.widths: Dict[int, int] = {}
 
     def write(self, x, y, value):
-        value = value or self.default_value
+        value = str(value or self.default_value)
         cell = self.ws.cell(row=y, column=x)
-        cell.value = str(value)
+        cell.value = value
+        if self.autosize_columns:
+            self.track_width(x, value)
+
+    def write_row(self, y, x_start, values):
+        cell = self.ws.cell
+        default_value = self.default_value
+        autosize_columns = self.autosize_columns
+        for x, value in enumerate(values, x_start):
+            value = str(value or default_value)
+            cell(row=y, column=x, value=value)
+            if autosize_columns:
+                self.track_width(x, value)
+
+    def track_width(self, key, value: str):
+        """Keeps maximum width of values written into column with key"""
+        width = max(len(line) for line in value.split('\n'))
+        if width > self.widths.get(key, 0):
+            self.widths[key] = width
+
+    def set_widths(self, widths: Dict[int, int], ws=None):
+        """Sets widths of physical columns of ws (written sheet by default) limited by max_column_width"""
+        dimensions = (ws or self.ws).column_dimensions
+        for x, width in widths.items():
+            # a little space for cell padding
+            dimensions[get_column_letter(x)].width = min(width + 2, self.max_column_width)
 
     def move_left(self, x_from, steps):
+        if self.widths:
+            self.widths = {(x + steps if x >= x_from else x): width for x, width in self.widths.items()}
+
         max_col = self.ws.max_column
         if x_from > self.ws.max_column:
             max_col = x_from
@@ -63,15 +104,65 @@ class OpenPyXlWriter(ExporterWriter):
         self.ws.freeze_panes = cell
 
     def to_file(self, filename='export'):
-        self.wb.save(filename)
+        if self.binary is not None:
+            with open(filename, 'wb') as f:
+                f.write(self.binary)
+            return
+
+        self.get_workbook().save(filename)
 
     def to_binary(self):
-        return save_virtual_workbook(self.wb)
+        if self.binary is not None:
+            return self.binary
+
+        return save_virtual_workbook(self.get_workbook())
+
+    def get_workbook(self):
+        """Returns workbook with all written data, ready to be saved"""
+        self.set_widths(self.widths)
+        return self.wb
+
+    def load_binary(self, content: bytes):
+        self.binary = content
+
+    def to_html(self):
+        """Renders sheet as html table, merged cells become row and column spans"""
+        ws = self.get_workbook().active
+        spans = {}
+        hidden = set()
+        for cell_range in ws.merged_cells.ranges:
+            spans[(cell_range.min_row, cell_range.min_col)] = (
+                cell_range.max_row - cell_range.min_row + 1,
+                cell_range.max_col - cell_range.min_col + 1,
+            )
+            hidden.update(
+                (row, col)
+                for row in range(cell_range.min_row, cell_range.max_row + 1)
+                for col in range(cell_range.min_col, cell_range.max_col + 1)
+            )
+
+        html = ['<table>']
+        for y, row in enumerate(ws.iter_rows(), 1):
+            html.append('<tr>')
+            for x, cell in enumerate(row, 1):
+                if (y, x) in hidden and (y, x) not in spans:
+                    continue
+
+                rowspan, colspan = spans.get((y, x), (1, 1))
+                attrs = ''
+                if rowspan > 1:
+                    attrs += f' rowspan="{rowspan}"'
+                if colspan > 1:
+                    attrs += f' colspan="{colspan}"'
+                html.append(f'<td{attrs}>{escape(str(cell.value or ""))}</td>')
+            html.append('</tr>')
+        html.append('</table>')
+        return ''.join(html)
 
     def to_response(self, filename='export'):
         filename = quote('{}.xlsx'.format(filename))
         response = HttpResponse(
-            content=save_virtual_workbook(self.wb),
+            content=self.to_binary(),
             content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
         response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
@@ -36,5 +36,8 @@ setup(
     install_requires=[
         'openpyxl',
         'django>=2.0'
-    ]
+    ],
+    extras_require={
+        'pydantic': ['pydantic>=2'],
+    },
 )
@@ -1,3 +1,5 @@
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
 
@@ -20,6 +22,7 @@ class Product(models.Model):
         max_length=255,
     )
     description = models.TextField()
+    tags = GenericRelation('Tag', related_query_name='product')
 
 
 class ProductProperty(models.Model):
@@ -31,3 +34,19 @@ class ProductProperty(models.Model):
         max_length=255,
     )
     quantity = models.IntegerField()
+
+
+class ShopSettings(models.Model):
+    shop = models.OneToOneField(Shop, on_delete=models.CASCADE, related_name='settings')
+    currency = models.CharField(
+        max_length=3,
+    )
+
+
+class Tag(models.Model):
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    name = models.CharField(
+        max_length=255,
+    )
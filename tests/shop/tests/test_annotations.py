@@ -0,0 +1,58 @@
+from django.db.models import Count, Sum, Value, TextField
+from django.db.models.functions import Concat
+from django.test import TestCase
+
+from cronista.base import ModelExporter
+from cronista.readers.django import DjangoModelReader, Annotation
+from cronista.xlsx.exporter import XlsxModelExporter
+from tests.shop.models import Shop, Product
+from tests.shop.tests.factory import ShopFactory, ProductFactory, ProductPropertyFactory
+
+
+class ProductExporter(ModelExporter):
+    model_reader = DjangoModelReader(Product)
+    fields = ('title', 'total_quantity')
+    annotations = {
+        'title': Annotation(Concat('description', Value(' / '), 'price', output_field=TextField()), 'Title'),
+        'total_quantity': Annotation(Sum('properties__quantity'), 'Total quantity'),
+    }
+
+
+class ShopExporter(XlsxModelExporter):
+    model_reader = DjangoModelReader(Shop)
+    fields = ('name', 'products_count')
+    annotations = {
+        'products_count': Annotation(Count('products'), 'Number of products'),
+    }
+    related = {
+        'products': ProductExporter,
+    }
+
+
+class AnnotationsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        shop = ShopFactory(name='Shop')
+        product = ProductFactory(shop=shop, description='Phone', price='10')
+        ProductPropertyFactory(product=product, quantity=2)
+        ProductPropertyFactory(product=product, quantity=3)
+        ProductFactory(shop=shop, description='Case', price='1')
+
+    def _rows(self, exporter):
+        return [[cell.value for cell in row] for row in exporter.exporter_writer.ws.iter_rows()]
+
+    def test(self):
+        exporter = ShopExporter()
+        with self.assertNumQueries(2):
+            exporter.export(Shop.objects.all())
+
+        rows = self._rows(exporter)
+        self.assertEqual(rows[0][:3], ['name', 'Number of products', 'products'])
+        self.assertEqual(rows[1][2:], ['Title', 'Total quantity'])
+        self.assertEqual(rows[2], ['Shop', '2', 'Phone / 10', '5'])
+        self.assertEqual(rows[3], ['Shop', '2', 'Case / 1', ''])
+
+    def test_not_queryset(self):
+        with self.assertRaises(ValueError):
+            ShopExporter().export(list(Shop.objects.all()))
@@ -0,0 +1,137 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.test import TestCase
+
+from cronista.cache import DjangoExportCache, FileLRUExportCache, MaxFieldVersion, CounterVersion
+from tests.shop.exporter import ShopExporter
+from tests.shop.models import Shop
+from tests.shop.tests.factory import ShopFactory, ProductFactory
+
+
+class CachedShopExporter(ShopExporter):
+    cache = DjangoExportCache()
+
+
+class VersionedShopExporter(ShopExporter):
+    cache = DjangoExportCache()
+    cache_version = MaxFieldVersion('name')
+
+
+class ExportCacheTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        shop = ShopFactory()
+        ProductFactory.create_batch(size=2, shop=shop)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached(self):
+        first = CachedShopExporter()
+        first.export(Shop.objects.all())
+        content = first.as_binary()
+
+        second = CachedShopExporter()
+        with self.assertNumQueries(0):
+            second.export(Shop.objects.all())
+        self.assertEqual(second.as_binary(), content)
+
+    def test_serialized_once(self):
+        exporter = CachedShopExporter()
+        with mock.patch.object(exporter.exporter_writer, 'get_workbook', wraps=exporter.exporter_writer.get_workbook) \
+                as get_workbook:
+            exporter.export(Shop.objects.all())
+            content = exporter.as_binary()
+
+        self.assertEqual(get_workbook.call_count, 1)
+        self.assertEqual(exporter.exporter_writer.binary, content)
+
+    def test_key_depends_on_queryset(self):
+        first = CachedShopExporter()
+        first.export(Shop.objects.all())
+
+        second = CachedShopExporter()
+        with self.assertNumQueries(1):
+            second.export(Shop.objects.filter(name='unknown'))
+
+    def test_version(self):
+        VersionedShopExporter().export(Shop.objects.all())
+        ShopFactory(name='Zzz')
+
+        exporter = VersionedShopExporter()
+        exporter.export(Shop.objects.all())
+        # data changed, so sheet is exported again instead of loading cached binary
+        values = [cell.value for row in exporter.exporter_writer.ws.iter_rows() for cell in row]
+        self.assertIn('Zzz', values)
+
+    def test_counter_version(self):
+        version = CounterVersion('shops')
+        self.assertEqual(version(Shop.objects.all()), 0)
+        version.bump()
+        self.assertEqual(version(Shop.objects.all()), 1)
+
+
+class ReplicaVersionedShopExporter(VersionedShopExporter):
+    using = 'replica'
+
+
+class ReplicaExportCacheTestCase(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_version(self):
+        with self.assertNumQueries(0, using='default'):
+            ReplicaVersionedShopExporter().export(Shop.objects.all())
+
+
+class DjangoExportCacheTestCase(TestCase):
+
+    def test_default_timeout(self):
+        export_cache = DjangoExportCache()
+        with mock.patch.object(cache, 'set') as cache_set:
+            export_cache.set('a', b'12345')
+
+        self.assertIs(cache_set.call_args[0][2], DEFAULT_TIMEOUT)
+
+    def test_timeout(self):
+        export_cache = DjangoExportCache(timeout=60)
+        with mock.patch.object(cache, 'set') as cache_set:
+            export_cache.set('a', b'12345')
+
+        self.assertEqual(cache_set.call_args[0][2], 60)
+
+
+class FileLRUExportCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = FileLRUExportCache(self.directory.name, max_size=10)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', b'12345')
+        self.assertEqual(self.cache.get('a'), b'12345')
+
+    def test_eviction(self):
+        self.cache.set('a', b'12345')
+        self.cache.set('b', b'12345')
+        os.utime(self.cache._get_path('a'), (0, 0))
+        self.cache.set('c', b'12345')
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get('b'), b'12345')
+        self.assertEqual(self.cache.get('c'), b'12345')
+
+    def test_too_large(self):
+        self.cache.set('a', b'12345678901')
+        self.assertIsNone(self.cache.get('a'))
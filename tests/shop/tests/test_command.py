@@ -0,0 +1,97 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+
+from tests.shop.exporter import ShopExporter
+from tests.shop.models import Shop
+from tests.shop.tests.factory import ShopFactory, ProductFactory
+
+
+class PrefetchedShopExporter(ShopExporter):
+
+    def annotate_qs(self, qs):
+        return qs.prefetch_related('products__properties')
+
+
+class ChunkedExportTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for _ in range(5):
+            ProductFactory(shop=ShopFactory())
+
+    def _export(self, chunk_size=None):
+        exporter = PrefetchedShopExporter()
+        exporter.chunk_size = chunk_size
+        exporter.export(Shop.objects.all())
+        return [[cell.value for cell in row] for row in exporter.exporter_writer.ws.iter_rows()]
+
+    def test(self):
+        # every chunk loads shops with prefetched products and properties
+        with self.assertNumQueries(3 * 3):
+            chunked = self._export(chunk_size=2)
+
+        self.assertEqual(chunked, self._export())
+
+    def test_keyset(self):
+        reader = PrefetchedShopExporter.model_reader
+        shops = list(Shop.objects.order_by('pk'))
+        first = reader.get_chunk(Shop.objects.all(), 0, 2)
+        # removed rows do not shift next chunks
+        first[0].delete()
+        second = reader.get_chunk(Shop.objects.all(), 2, 2, last=first[-1])
+
+        self.assertEqual(second, shops[2:4])
+
+    def test_wrong_chunk_size(self):
+        exporter = PrefetchedShopExporter()
+        exporter.chunk_size = 0
+        with self.assertRaises(ValueError):
+            exporter.export(Shop.objects.all())
+
+
+class ExportCommandTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        ShopFactory(name='First')
+        ShopFactory(name='Second')
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'export.xlsx')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test(self):
+        stdout = StringIO()
+        call_command(
+            'cronista_export', 'tests.shop.exporter.ShopExporter',
+            output=self.output, filters=['name=First'], chunk_size=1, profile=True, memory=True, top=5,
+            stdout=stdout,
+        )
+
+        self.assertTrue(os.path.exists(self.output))
+        output = stdout.getvalue()
+        self.assertIn('Exported to', output)
+        self.assertIn('cumulative', output)
+        self.assertIn('Peak memory', output)
+
+    def test_wrong_chunk_size(self):
+        with self.assertRaises(CommandError):
+            call_command('cronista_export', 'tests.shop.exporter.ShopExporter', '--chunk-size=0', output=self.output)
+
+    def test_wrong_filter(self):
+        with self.assertRaises(CommandError):
+            call_command('cronista_export', 'tests.shop.exporter.ShopExporter', output=self.output, filters=['name'])
+
+    def test_memory_limit(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                'cronista_export', 'tests.shop.exporter.ShopExporter',
+                output=self.output, chunk_size=1, memory_limit=0.000001, stdout=StringIO(),
+            )
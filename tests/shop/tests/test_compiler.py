@@ -0,0 +1,75 @@
+from django.test import TestCase
+
+from cronista.base import ModelExporter
+from cronista.base.compiler import compile_exporter
+from cronista.readers.django import DjangoModelReader
+from cronista.xlsx.exporter import XlsxModelExporter
+from tests.shop import exporter
+from tests.shop.models import Shop, Product, ProductProperty, ShopSettings
+from tests.shop.tests.factory import ShopFactory, ProductFactory, ProductPropertyFactory
+
+
+class PropertyExporter(ModelExporter):
+    model_reader = DjangoModelReader(ProductProperty)
+    state = ModelExporter.HORIZONTAL
+    fields = ('name', 'quantity')
+    limit = 2
+
+
+class SettingsExporter(ModelExporter):
+    model_reader = DjangoModelReader(ShopSettings)
+    fields = ('currency',)
+
+
+class ProductExporter(ModelExporter):
+    model_reader = DjangoModelReader(Product)
+    fields = ('description', 'shop__name')
+    related = {
+        'properties': PropertyExporter,
+    }
+
+    def get_field_value(self, obj, field_name: str):
+        value = super().get_field_value(obj, field_name)
+        return value.upper() if field_name == 'description' else value
+
+
+class ShopExporter(XlsxModelExporter):
+    model_reader = DjangoModelReader(Shop)
+    fields = ('name',)
+    related = {
+        'products': ProductExporter,
+        'settings': SettingsExporter,
+    }
+
+
+class CompilerTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for products_n in (3, 0, 1, 4):
+            shop = ShopFactory()
+            if products_n:
+                ShopSettings.objects.create(shop=shop, currency=f'C{products_n}')
+            for i, product in enumerate(ProductFactory.create_batch(size=products_n, shop=shop)):
+                ProductPropertyFactory.create_batch(size=(i * 2) % 5, product=product)
+
+    def _export(self, exporter_class, compiled, qs=None):
+        exporter = type(exporter_class.__name__, (exporter_class,), {'compiled': compiled})()
+        exporter.export(Shop.objects.order_by('pk') if qs is None else qs)
+        ws = exporter.exporter_writer.ws
+        rows = [[cell.value for cell in row] for row in ws.iter_rows()]
+        return rows, sorted(str(cell_range) for cell_range in ws.merged_cells.ranges), exporter.column_end
+
+    def _assert_same(self, exporter_class, qs=None):
+        self.assertEqual(self._export(exporter_class, True, qs), self._export(exporter_class, False, qs))
+
+    def test(self):
+        self._assert_same(exporter.ShopExporter)
+
+    def test_mixed(self):
+        self._assert_same(ShopExporter)
+
+    def test_source(self):
+        export_obj = compile_exporter(exporter.ProductExporter)
+        self.assertIn("get_related(obj, 'properties')", export_obj.source)
+        self.assertNotIn('for ', export_obj.source)
@@ -0,0 +1,48 @@
+from django.test import TestCase
+
+from tests.shop.exporter import ShopExporter
+from tests.shop.models import Shop, Product, ProductProperty
+from tests.shop.tests.test_limit import ShopExporter as LimitedShopExporter
+
+
+class ReplicaShopExporter(ShopExporter):
+    using = 'replica'
+    chunk_size = 1
+    snapshot = True
+
+
+class ReplicaLimitedShopExporter(LimitedShopExporter):
+    using = 'replica'
+
+
+class DatabaseTestCase(TestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        Shop.objects.create(name='Default shop', date='')
+        for name in ('First', 'Second'):
+            shop = Shop.objects.using('replica').create(name=f'{name} replica shop', date='')
+            product = Product.objects.using('replica').create(shop=shop, price='1', description=f'{name} product')
+            ProductProperty.objects.using('replica').create(product=product, name='size', value='L', quantity=1)
+
+    def _values(self, exporter):
+        return {cell.value for row in exporter.exporter_writer.ws.iter_rows() for cell in row}
+
+    def test(self):
+        exporter = ReplicaShopExporter()
+        with self.assertNumQueries(0, using='default'):
+            exporter.export(Shop.objects.all())
+
+        values = self._values(exporter)
+        self.assertIn('First replica shop', values)
+        self.assertIn('Second product', values)
+        self.assertIn('size', values)
+        self.assertNotIn('Default shop', values)
+
+    def test_prefetch(self):
+        exporter = ReplicaLimitedShopExporter()
+        with self.assertNumQueries(0, using='default'), self.assertNumQueries(3, using='replica'):
+            exporter.export(Shop.objects.all())
+
+        self.assertIn('Second product', self._values(exporter))
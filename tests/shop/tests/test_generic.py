@@ -0,0 +1,113 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from cronista.base import ModelExporter
+from cronista.readers.django import DjangoModelReader
+from cronista.xlsx.exporter import XlsxModelExporter
+from tests.shop.models import Shop, Product, ShopSettings, Tag
+from tests.shop.tests.factory import ShopFactory, ProductFactory
+
+
+class TaggedProductExporter(ModelExporter):
+    model_reader = DjangoModelReader(Product)
+    fields = ('description',)
+
+
+class TagExporter(ModelExporter):
+    model_reader = DjangoModelReader(Tag)
+    fields = ('name',)
+    state = ModelExporter.HORIZONTAL
+    related = {
+        'content_object': TaggedProductExporter,
+    }
+
+
+class ProductExporter(ModelExporter):
+    model_reader = DjangoModelReader(Product)
+    fields = ('description',)
+    related = {
+        'tags': TagExporter,
+    }
+
+
+class ShopSettingsExporter(ModelExporter):
+    model_reader = DjangoModelReader(ShopSettings)
+    fields = ('currency',)
+
+
+class ShopExporter(XlsxModelExporter):
+    model_reader = DjangoModelReader(Shop)
+    fields = ('name',)
+    related = {
+        'settings': ShopSettingsExporter,
+        'products': ProductExporter,
+    }
+
+
+class LimitedTagExporter(TagExporter):
+    limit = 1
+    ordering = ('name',)
+
+
+class GenericRelationsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            shop = ShopFactory()
+            if i:
+                ShopSettings.objects.create(shop=shop, currency=f'US{i}')
+
+            for product in ProductFactory.create_batch(size=2, shop=shop):
+                Tag.objects.create(content_object=product, name=f'b {product.description}')
+                Tag.objects.create(content_object=product, name=f'a {product.description}')
+
+    def setUp(self):
+        ContentType.objects.get_for_model(Product)
+
+    def _values(self, exporter):
+        return {cell.value for row in exporter.exporter_writer.ws.iter_rows() for cell in row}
+
+    def test_field_names(self):
+        reader = ShopExporter.model_reader
+        self.assertEqual(reader.get_field_name('settings'), 'shop settings')
+        self.assertEqual(TagExporter.model_reader.get_field_name('content_object'), 'content_object')
+        self.assertEqual(ProductExporter.model_reader.get_field_name('tags'), 'tags')
+
+    def test_export(self):
+        exporter = ShopExporter()
+        # shops, settings, products, tags and tagged products of one content type
+        with self.assertNumQueries(5):
+            exporter.export(Shop.objects.all())
+
+        values = self._values(exporter)
+        self.assertTrue({'US1', 'US2'} <= values)
+        product = Product.objects.first()
+        self.assertTrue({f'a {product.description}', f'b {product.description}'} <= values)
+
+    def test_limit(self):
+        class LimitedProductExporter(ProductExporter):
+            related = {
+                'tags': LimitedTagExporter,
+            }
+
+        prefetch = ShopExporter.model_reader.get_prefetch('products', LimitedProductExporter)
+        with CaptureQueriesContext(connection) as queries:
+            shop = Shop.objects.prefetch_related(prefetch).first()
+        for product in shop.products.all():
+            self.assertEqual([tag.name for tag in product.tags.all()], [f'a {product.description}'])
+
+        # only tags of prefetched products are numbered
+        window_sql = next(query['sql'] for query in queries if 'ROW_NUMBER' in query['sql'])
+        inner_sql = window_sql[window_sql.index('ROW_NUMBER'):window_sql.index('cronista_window')]
+        self.assertIn('"object_id" IN (', inner_sql)
+
+    def test_not_prefetched(self):
+        reader = ShopExporter.model_reader
+        shop_without_settings = Shop.objects.filter(settings__isnull=True).get()
+        self.assertEqual(reader.get_related_field_value(shop_without_settings, 'settings'), [])
+
+        tag = Tag.objects.first()
+        self.assertEqual(TagExporter.model_reader.get_related_field_value(tag, 'content_object'), [tag.content_object])
@@ -0,0 +1,173 @@
+import io
+
+from django.test import TestCase
+
+from cronista.base import ModelExporter
+from cronista.readers.django import DjangoModelReader
+from cronista.xlsx import XlsxModelExporter, XlsxModelImporter
+from tests.shop.models import Shop, Product, ProductProperty, ShopSettings
+from tests.shop.tests.factory import ShopFactory, ProductFactory, ProductPropertyFactory
+
+
+class PropertyExporter(ModelExporter):
+    model_reader = DjangoModelReader(ProductProperty)
+    fields = ('name', 'value', 'quantity')
+    state = ModelExporter.HORIZONTAL
+
+
+class ProductExporter(ModelExporter):
+    model_reader = DjangoModelReader(Product)
+    fields = ('description', 'price')
+    related = {
+        'properties': PropertyExporter,
+    }
+
+
+class ShopExporter(XlsxModelExporter):
+    model_reader = DjangoModelReader(Shop)
+    fields = ('name', 'date')
+    related = {
+        'products': ProductExporter,
+    }
+
+
+class ShopWithIdExporter(ShopExporter):
+    fields = ('id', 'name', 'date')
+
+
+class PropertyWithIdExporter(PropertyExporter):
+    fields = ('id', 'name', 'value', 'quantity')
+
+
+class ProductWithIdExporter(ProductExporter):
+    fields = ('id', 'description', 'price')
+    related = {
+        'properties': PropertyWithIdExporter,
+    }
+
+
+class ShopWithAllIdsExporter(ShopWithIdExporter):
+    related = {
+        'products': ProductWithIdExporter,
+    }
+
+
+class SettingsExporter(ModelExporter):
+    model_reader = DjangoModelReader(ShopSettings)
+    fields = ('currency',)
+
+
+class ShopWithSettingsExporter(ShopWithIdExporter):
+    related = {
+        'settings': SettingsExporter,
+        'products': ProductWithIdExporter,
+    }
+
+
+class ShopNameExporter(XlsxModelExporter):
+    model_reader = DjangoModelReader(Shop)
+    fields = ('name', 'date')
+
+
+def dump_shops():
+    return [
+        (
+            shop.name,
+            shop.date,
+            [
+                (product.description, product.price, [
+                    (p.name, p.value, p.quantity) for p in product.properties.order_by('pk')
+                ])
+                for product in shop.products.order_by('pk')
+            ],
+        )
+        for shop in Shop.objects.order_by('pk')
+    ]
+
+
+class ImporterTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for products_n in (2, 0, 3):
+            shop = ShopFactory()
+            for i, product in enumerate(ProductFactory.create_batch(size=products_n, shop=shop)):
+                ProductPropertyFactory.create_batch(size=i, product=product)
+
+    def _export(self, exporter_class=ShopExporter):
+        exporter = exporter_class()
+        exporter.export(Shop.objects.order_by('pk'))
+        return io.BytesIO(exporter.as_binary())
+
+    def test_create(self):
+        Shop.objects.update(name='dup', date='2020')
+        Product.objects.update(description='dup', price='1')
+        expected = dump_shops()
+        file = self._export(ShopWithIdExporter)
+        Shop.objects.all().delete()
+
+        imported = XlsxModelImporter(ShopWithIdExporter).import_file(file)
+
+        self.assertEqual(imported, 3)
+        self.assertEqual(dump_shops(), expected)
+
+    def test_one_row_objects(self):
+        Shop.objects.update(name='dup', date='2020')
+        file = self._export(ShopNameExporter)
+        Shop.objects.all().delete()
+
+        imported = XlsxModelImporter(ShopNameExporter).import_file(file)
+
+        self.assertEqual(imported, 3)
+        self.assertEqual(list(Shop.objects.values_list('name', 'date')), [('dup', '2020')] * 3)
+
+    def test_vertical_siblings(self):
+        for i, shop in enumerate(Shop.objects.order_by('pk')):
+            ShopSettings.objects.create(shop=shop, currency=f'C{i}')
+        expected = dump_shops()
+        settings = list(ShopSettings.objects.order_by('shop').values_list('shop', 'currency'))
+        file = self._export(ShopWithSettingsExporter)
+        Shop.objects.all().delete()
+
+        XlsxModelImporter(ShopWithSettingsExporter).import_file(file)
+
+        self.assertEqual(dump_shops(), expected)
+        self.assertEqual(list(ShopSettings.objects.order_by('shop').values_list('shop', 'currency')), settings)
+
+    def test_without_pk(self):
+        file = self._export()
+
+        with self.assertRaises(ValueError):
+            XlsxModelImporter(ShopExporter).import_file(file)
+
+    def test_update(self):
+        Shop.objects.update(name='Exported')
+        Product.objects.update(description='Exported')
+        file = self._export(ShopWithAllIdsExporter)
+        Shop.objects.update(name='Changed')
+        Product.objects.update(description='Changed')
+
+        XlsxModelImporter(ShopWithAllIdsExporter, batch_size=2).import_file(file)
+
+        self.assertEqual(Shop.objects.count(), 3)
+        self.assertEqual(set(Shop.objects.values_list('name', flat=True)), {'Exported'})
+        self.assertEqual(Product.objects.count(), 5)
+        self.assertEqual(set(Product.objects.values_list('description', flat=True)), {'Exported'})
+        self.assertEqual(ProductProperty.objects.count(), 4)
+
+    def test_update_without_related_pk(self):
+        file = self._export(ShopWithIdExporter)
+        Shop.objects.update(name='Changed')
+
+        with self.assertRaises(ValueError):
+            XlsxModelImporter(ShopWithIdExporter).import_file(file)
+
+        self.assertEqual(set(Shop.objects.values_list('name', flat=True)), {'Changed'})
+        self.assertEqual(Product.objects.count(), 5)
+
+    def test_wrong_header(self):
+        class OtherShopExporter(ShopExporter):
+            fields = ('date', 'name')
+
+        with self.assertRaises(ValueError):
+            XlsxModelImporter(OtherShopExporter).import_file(self._export())
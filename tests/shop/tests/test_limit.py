@@ -0,0 +1,83 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from cronista.base import ModelExporter
+from cronista.readers.django import DjangoModelReader
+from cronista.xlsx.exporter import XlsxModelExporter
+from tests.shop.models import Shop, Product, ProductProperty
+from tests.shop.tests.factory import ShopFactory, ProductFactory, ProductPropertyFactory
+
+
+class TopPropertyExporter(ModelExporter):
+    model = ProductProperty
+    model_reader = DjangoModelReader(ProductProperty)
+    fields = ('name', 'quantity')
+    limit = 2
+    ordering = ('-quantity',)
+
+
+class ProductExporter(ModelExporter):
+    model = Product
+    model_reader = DjangoModelReader(Product)
+    fields = ('description',)
+    related = {
+        'properties': TopPropertyExporter,
+    }
+
+
+class ShopExporter(XlsxModelExporter):
+    model = Shop
+    model_reader = DjangoModelReader(Shop)
+    fields = ('name',)
+    related = {
+        'products': ProductExporter,
+    }
+
+
+class LimitTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        shop = ShopFactory()
+        for product in ProductFactory.create_batch(size=2, shop=shop):
+            for quantity in (1, 5, 3, 4):
+                ProductPropertyFactory(product=product, quantity=quantity)
+
+    def test_prefetch(self):
+        qs = ShopExporter().prefetch_qs(Shop.objects.all())
+        with self.assertNumQueries(3):
+            shops = list(qs)
+            for product in shops[0].products.all():
+                quantities = [p.quantity for p in product.properties.all()]
+                self.assertEqual(quantities, [5, 4])
+
+    def test_export(self):
+        exporter = ShopExporter()
+        with self.assertNumQueries(3):
+            exporter.export(Shop.objects.all())
+
+        ws = exporter.exporter_writer.ws
+        quantities = [ws.cell(row=row, column=4).value for row in range(4, 6)]
+        self.assertEqual(quantities, ['5', '4'])
+
+    def test_window_restricted_to_parents(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(ShopExporter().prefetch_qs(Shop.objects.all()))
+
+        # only properties of prefetched products are numbered
+        window_sql = next(query['sql'] for query in queries if 'ROW_NUMBER' in query['sql'])
+        inner_sql = window_sql[window_sql.index('ROW_NUMBER'):window_sql.index('cronista_window')]
+        self.assertIn('"product_id" IN (', inner_sql)
+
+    def test_not_prefetched(self):
+        shop = Shop.objects.get()
+        product = shop.products.first()
+        nested = ProductExporter(column_start=1).nested_exporters['properties']
+        self.assertEqual(len(nested.limit_objects(list(product.properties.all()))), 2)
+
+    def test_ordering_only(self):
+        class OrderedPropertyExporter(TopPropertyExporter):
+            limit = None
+
+        self.assertTrue(OrderedPropertyExporter.requires_prefetch())
@@ -0,0 +1,80 @@
+from django.test import TestCase
+
+from cronista.base import ModelExporter
+from cronista.readers.django import DjangoModelReader
+from cronista.xlsx.exporter import XlsxModelExporter
+from tests.shop.models import Shop, Product, ProductProperty, ShopSettings
+from tests.shop.tests.factory import ShopFactory, ProductFactory, ProductPropertyFactory
+
+
+class ProductExporter(XlsxModelExporter):
+    model_reader = DjangoModelReader(Product)
+    fields = ('description', 'shop__name', 'shop__settings__currency')
+
+
+class PropertyExporter(ModelExporter):
+    model_reader = DjangoModelReader(ProductProperty)
+    fields = ('name', 'product__description')
+
+
+class NestedProductExporter(ModelExporter):
+    model_reader = DjangoModelReader(Product)
+    fields = ('description', 'shop__name')
+    related = {
+        'properties': PropertyExporter,
+    }
+
+
+class ShopExporter(XlsxModelExporter):
+    model_reader = DjangoModelReader(Shop)
+    fields = ('name',)
+    related = {
+        'products': NestedProductExporter,
+    }
+
+
+class LookupsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        shop = ShopFactory(name='Shop')
+        ShopSettings.objects.create(shop=shop, currency='EUR')
+        product = ProductFactory(shop=shop, description='Phone')
+        ProductPropertyFactory(product=product, name='color')
+        ProductFactory(shop=ShopFactory(name='Other'), description='Case')
+
+    def _rows(self, exporter):
+        return [[cell.value for cell in row] for row in exporter.exporter_writer.ws.iter_rows()]
+
+    def test(self):
+        exporter = ProductExporter()
+        with self.assertNumQueries(1):
+            exporter.export(Product.objects.order_by('pk'))
+
+        self.assertEqual(self._rows(exporter), [
+            ['description', 'shop name', 'shop shop settings currency'],
+            ['Phone', 'Shop', 'EUR'],
+            ['Case', 'Other', ''],
+        ])
+
+    def test_related(self):
+        exporter = ShopExporter()
+        with self.assertNumQueries(3):
+            exporter.export(Shop.objects.order_by('pk'))
+
+        rows = self._rows(exporter)
+        self.assertEqual(rows[2][3:], ['name', 'product description'])
+        self.assertEqual(rows[3], ['Shop', 'Phone', 'Shop', 'color', 'Phone'])
+        self.assertEqual(rows[4], ['Other', 'Case', 'Other', None, None])
+
+    def test_not_queryset(self):
+        exporter = ProductExporter()
+        with self.assertNumQueries(3):
+            exporter.export(list(Product.objects.order_by('pk')))
+
+        self.assertEqual(self._rows(exporter)[1], ['Phone', 'Shop', 'EUR'])
+
+    def test_multiple_relation(self):
+        reader = DjangoModelReader(Shop)
+        with self.assertRaises(ValueError):
+            reader.get_select_related(['products__description'])
@@ -0,0 +1,129 @@
+import io
+from itertools import cycle
+from unittest import mock
+
+from django.test import TestCase, SimpleTestCase
+from openpyxl import load_workbook
+
+from cronista.base.memory import MemoryGovernor, MemoryLimitExceeded
+from cronista.xlsx.writer import MappedOpenPyXlWriter
+from tests.shop.exporter import ShopExporter
+from tests.shop.models import Shop
+from tests.shop.tests.factory import ShopFactory, ProductFactory
+
+
+class ChunkedShopExporter(ShopExporter):
+    chunk_size = 4
+
+
+class FixedUsageGovernor(MemoryGovernor):
+
+    def __init__(self, usages, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.usages = iter(usages)
+
+    def get_usage(self):
+        return next(self.usages)
+
+
+class MemoryGovernorTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.writer = MappedOpenPyXlWriter()
+        self.writer.write_row(y=1, x_start=1, values=['a', 'b'])
+        self.exporter = ChunkedShopExporter()
+
+    def test_release(self):
+        FixedUsageGovernor([200, 50], limit=100, exporter_writer=self.writer).check(self.exporter)
+
+        self.assertEqual(self.exporter.chunk_size, 4)
+        self.assertEqual(self.writer.cells, {})
+        self.writer.write(x=1, y=2, value='c')
+        values = [[cell.value for cell in row] for row in self.writer.get_workbook().active.iter_rows()]
+        self.assertEqual(values, [['a', 'b'], ['c', None]])
+
+    def test_streamed(self):
+        self.writer.autosize_columns = True
+        self.writer.write_row(y=3, x_start=1, values=['c', 'd'])
+        self.writer.release_memory()
+        self.writer.write_row(y=4, x_start=1, values=['e', 'f'])
+        self.writer.release_memory()
+        # header and row overlapping spilled rows are written after spilling
+        self.writer.move_left(x_from=2, steps=1)
+        self.writer.write_row(y=1, x_start=2, values=['header'])
+        self.writer.write(x=3, y=4, value='g')
+        # merged over cell 'b', which is hidden by the merge
+        self.writer.merge_range(min_col=2, min_row=1, max_col=3, max_row=1)
+        self.writer.freeze_panes(col=1, row=2)
+
+        ws = load_workbook(io.BytesIO(self.writer.to_binary())).active
+        expected = self.writer.get_workbook().active
+        values = [[cell.value for cell in row] for row in ws.iter_rows()]
+        self.assertEqual(values, [[cell.value for cell in row] for row in expected.iter_rows()])
+        self.assertEqual(values, [['a', 'header', None], [None, None, None], ['c', None, 'd'], ['e', None, 'g']])
+        self.assertEqual(ws.merged_cells.ranges, expected.merged_cells.ranges)
+        self.assertEqual(ws.freeze_panes, 'A2')
+        self.assertEqual(ws.column_dimensions['B'].width, expected.column_dimensions['B'].width)
+
+    def test_chunk_size(self):
+        governor = FixedUsageGovernor([200] * 6, limit=100, exporter_writer=self.writer)
+        governor.check(self.exporter)
+        self.assertEqual(self.exporter.chunk_size, 2)
+        governor.check(self.exporter)
+        self.assertEqual(self.exporter.chunk_size, 1)
+
+        with self.assertRaises(MemoryLimitExceeded):
+            governor.check(self.exporter)
+
+    def test_wrong_measure(self):
+        with self.assertRaises(ValueError):
+            MemoryGovernor(limit=100, exporter_writer=self.writer, measure='heap')
+
+
+class MemoryLimitTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for _ in range(10):
+            ProductFactory(shop=ShopFactory())
+
+    def _export(self, exporter):
+        exporter.export(Shop.objects.all())
+        return [[cell.value for cell in row] for row in exporter.exporter_writer.ws.iter_rows()]
+
+    def test(self):
+        exporter = ChunkedShopExporter()
+        exporter.memory_limit = 1024 ** 3
+        self.assertEqual(self._export(exporter), self._export(ShopExporter()))
+        self.assertEqual(exporter.chunk_size, 4)
+
+    def test_spilled(self):
+        class MappedShopExporter(ChunkedShopExporter):
+            writer_class = MappedOpenPyXlWriter
+            memory_limit = 100
+
+        exporter = MappedShopExporter()
+        # every check is over the limit before writer releases memory and under it after
+        with mock.patch.object(MemoryGovernor, 'get_usage', side_effect=cycle([200, 50])):
+            exporter.export(Shop.objects.all())
+
+        self.assertEqual(len(exporter.exporter_writer.batches), 2)
+        ws = load_workbook(io.BytesIO(exporter.as_binary())).active
+        values = [[cell.value or '' for cell in row] for row in ws.iter_rows()]
+        expected = [[value or '' for value in row] for row in self._export(ShopExporter())]
+        self.assertEqual(values, expected)
+
+    def test_exceeded(self):
+        exporter = ChunkedShopExporter()
+        exporter.memory_limit = 1
+        with self.assertRaises(MemoryLimitExceeded):
+            exporter.export(Shop.objects.all())
+
+        self.assertEqual(exporter.chunk_size, 1)
+        self.assertIsNone(exporter.memory_governor)
+
+    def test_without_chunks(self):
+        exporter = ShopExporter()
+        exporter.memory_limit = 1024 ** 3
+        with self.assertRaises(ValueError):
+            exporter.export(Shop.objects.all())
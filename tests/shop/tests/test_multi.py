@@ -0,0 +1,155 @@
+import csv
+import io
+import os
+import tempfile
+import zipfile
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from cronista.cache import DjangoExportCache, FileLRUExportCache
+from cronista.csv.writer import CsvWriter
+from cronista.xlsx.writer import OpenPyXlWriter, MappedOpenPyXlWriter
+from tests.shop.exporter import ShopExporter
+from tests.shop.models import Shop
+from tests.shop.tests.factory import ShopFactory, ProductFactory, ProductPropertyFactory
+
+
+class Utf16CsvWriter(CsvWriter):
+    encoding = 'utf-16'
+
+
+def strip_rows(rows):
+    rows = [list(row) for row in rows]
+    for row in rows:
+        while row and row[-1] == '':
+            row.pop()
+
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+class MultiWriterTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for _ in range(2):
+            shop = ShopFactory()
+            for product in ProductFactory.create_batch(size=2, shop=shop):
+                ProductPropertyFactory.create_batch(size=2, product=product)
+
+    def test(self):
+        exporter = ShopExporter(writers=[OpenPyXlWriter(), CsvWriter()])
+        with self.assertNumQueries(7):
+            exporter.export(Shop.objects.all())
+
+        xlsx_writer, csv_writer = exporter.exporter_writer.writers
+        xlsx_rows = [
+            [cell.value or '' for cell in row]
+            for row in xlsx_writer.ws.iter_rows()
+        ]
+        csv_rows = list(csv.reader(io.StringIO(csv_writer.to_text())))
+        self.assertEqual(strip_rows(csv_rows), strip_rows(xlsx_rows))
+
+    def test_to_file(self):
+        exporter = ShopExporter(writers=[OpenPyXlWriter(), CsvWriter()])
+        exporter.export(Shop.objects.all())
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'export')
+            exporter.as_file(filename)
+            self.assertTrue(os.path.exists(f'{filename}.xlsx'))
+            self.assertTrue(os.path.exists(f'{filename}.csv'))
+
+    def test_to_response(self):
+        exporter = ShopExporter(writers=[OpenPyXlWriter(), CsvWriter()])
+        exporter.export(Shop.objects.all())
+
+        response = exporter.as_http_response('shops')
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename=shops.zip')
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            self.assertEqual(archive.namelist(), ['export.xlsx', 'export.csv'])
+            self.assertEqual(archive.read('export.csv'), exporter.exporter_writer.writers[1].to_binary())
+
+    def test_same_format(self):
+        exporter = ShopExporter(writers=[CsvWriter(), Utf16CsvWriter()])
+        exporter.export(Shop.objects.all())
+
+        other = ShopExporter(writers=[CsvWriter(), Utf16CsvWriter()])
+        other.exporter_writer.load_binary(exporter.as_binary())
+        self.assertEqual(
+            [writer.to_binary() for writer in other.exporter_writer.writers],
+            [writer.to_binary() for writer in exporter.exporter_writer.writers],
+        )
+        self.assertEqual(other.exporter_writer.get_names(), ['export.csv', 'export-2.csv'])
+
+
+class MultiWriterCacheTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        shop = ShopFactory()
+        ProductFactory.create_batch(size=2, shop=shop)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertCached(self, exporter_class):
+        first = exporter_class(writers=[OpenPyXlWriter(), CsvWriter()])
+        first.export(Shop.objects.all())
+        csv_content = first.exporter_writer.writers[1].to_binary()
+
+        second = exporter_class(writers=[OpenPyXlWriter(), CsvWriter()])
+        with self.assertNumQueries(0):
+            second.export(Shop.objects.all())
+        self.assertEqual(second.as_binary(), first.as_binary())
+        self.assertEqual(second.exporter_writer.writers[1].to_binary(), csv_content)
+
+    def test_django_cache(self):
+        class CachedShopExporter(ShopExporter):
+            cache = DjangoExportCache()
+
+        self.assertCached(CachedShopExporter)
+
+    def test_file_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            class CachedShopExporter(ShopExporter):
+                cache = FileLRUExportCache(directory)
+
+            self.assertCached(CachedShopExporter)
+
+    def test_key_depends_on_writers(self):
+        class CachedShopExporter(ShopExporter):
+            cache = DjangoExportCache()
+
+        CachedShopExporter(writers=[OpenPyXlWriter(), CsvWriter()]).export(Shop.objects.all())
+
+        for writers in ([CsvWriter()], [CsvWriter(), OpenPyXlWriter()]):
+            exporter = CachedShopExporter(writers=writers)
+            with CaptureQueriesContext(connection) as queries:
+                exporter.export(Shop.objects.all())
+            self.assertTrue(queries.captured_queries)
+
+
+class MappedWriterTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for products_n in (1, 3, 2):
+            shop = ShopFactory()
+            for i, product in enumerate(ProductFactory.create_batch(size=products_n, shop=shop)):
+                ProductPropertyFactory.create_batch(size=i + 1, product=product)
+
+    def test(self):
+        exporter = ShopExporter(writers=[OpenPyXlWriter(), MappedOpenPyXlWriter()])
+        exporter.export(Shop.objects.all())
+
+        xlsx_writer, mapped_writer = exporter.exporter_writer.writers
+        xlsx_rows = [[cell.value or '' for cell in row] for row in xlsx_writer.ws.iter_rows()]
+        mapped_rows = [[cell.value or '' for cell in row] for row in mapped_writer.get_workbook().active.iter_rows()]
+        self.assertEqual(strip_rows(mapped_rows), strip_rows(xlsx_rows))
+        self.assertEqual(mapped_writer.ws.merged_cells.ranges, xlsx_writer.ws.merged_cells.ranges)
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from cronista.base.model import Preview
+from cronista.csv.writer import CsvWriter
+from cronista.xlsx.writer import OpenPyXlWriter
+from tests.shop.exporter import ShopExporter
+from tests.shop.models import Shop
+from tests.shop.tests.factory import ShopFactory, ProductFactory, ProductPropertyFactory
+
+
+class PreviewTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for products_n in (3, 1, 4):
+            shop = ShopFactory()
+            for i, product in enumerate(ProductFactory.create_batch(size=products_n, shop=shop)):
+                ProductPropertyFactory.create_batch(size=i + 1, product=product)
+
+    def test(self):
+        exporter = ShopExporter()
+        preview = exporter.preview(Shop.objects.all(), size=2)
+
+        self.assertIsInstance(preview, Preview)
+        self.assertIsInstance(preview.content, bytes)
+        products = exporter.nested_exporters['products']
+        # two root shops with at most two horizontal products
+        self.assertEqual(products.get_number(), 2)
+
+    def test_html(self):
+        preview = ShopExporter().preview(Shop.objects.all(), size=1, html=True)
+
+        self.assertTrue(preview.content.startswith('<table>'))
+        self.assertIn('colspan=', preview.content)
+        shop = Shop.objects.order_by('pk').first()
+        self.assertIn(shop.name, preview.content)
+        self.assertNotIn(Shop.objects.order_by('pk').last().name, preview.content)
+
+    def test_next_chunk_not_fetched(self):
+        exporter = ShopExporter()
+        with CaptureQueriesContext(connection) as queries:
+            exporter.preview(Shop.objects.all(), size=2)
+
+        shop_queries = [query['sql'] for query in queries.captured_queries if 'FROM "shop_shop"' in query['sql']]
+        # chunk of two shops and count of shops for estimate, but no chunk after them
+        self.assertEqual(len(shop_queries), 2, shop_queries)
+
+    def test_html_several_writers(self):
+        exporter = ShopExporter(writers=[CsvWriter(), OpenPyXlWriter()])
+        preview = exporter.preview(Shop.objects.all(), size=1, html=True)
+
+        self.assertTrue(preview.content.startswith('<table>'))
+        self.assertIn(Shop.objects.order_by('pk').first().name, preview.content)
+
+    def test_wrong_size(self):
+        with self.assertRaisesMessage(ValueError, 'Preview size should be positive'):
+            ShopExporter().preview(Shop.objects.all(), size=0)
+
+    def test_estimate(self):
+        exporter = ShopExporter()
+        with self.assertNumQueries(1):
+            rows, columns = exporter.estimate_size(Shop.objects.all())
+
+        # 3 header rows, 3 shops and extra rows for all properties (6 + 1 + 10) of every shop
+        self.assertEqual(rows, 3 + 3 + 17 - 3)
+        # shop fields + max 4 products of 2 fields and 3 property fields
+        self.assertEqual(columns, 2 + 4 * 5)
+
+        full = ShopExporter()
+        full.export(Shop.objects.all())
+        ws = full.exporter_writer.ws
+        used_columns = max(cell.column for row in ws.iter_rows() for cell in row if cell.value is not None)
+        self.assertEqual(used_columns, columns)
+        self.assertGreaterEqual(rows, ws.max_row)
@@ -0,0 +1,88 @@
+import warnings
+
+from django.test import TestCase
+
+from cronista.base import ModelExporter
+from cronista.base.queries import QueryBudgetExceeded, QueryBudgetWarning
+from tests.shop.exporter import ShopExporter, ProductExporter, ProductPropertyExporter
+from tests.shop.models import Shop
+from tests.shop.tests.factory import ShopFactory, ProductFactory, ProductPropertyFactory
+
+
+class StrictShopExporter(ShopExporter):
+    strict_queries = ModelExporter.STRICT_RAISE
+
+
+class WarningShopExporter(ShopExporter):
+    strict_queries = ModelExporter.STRICT_WARN
+
+
+class PrefetchedShopExporter(StrictShopExporter):
+
+    def annotate_qs(self, qs):
+        return qs.prefetch_related('products__properties')
+
+
+class QueryBudgetTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for _ in range(2):
+            shop = ShopFactory()
+            for product in ProductFactory.create_batch(size=2, shop=shop):
+                ProductPropertyFactory(product=product)
+
+    def test_raise(self):
+        with self.assertRaises(QueryBudgetExceeded) as e:
+            StrictShopExporter().export(Shop.objects.all())
+
+        message = str(e.exception)
+        self.assertIn('ShopExporter.products executed 2 queries for 2 objects', message)
+        self.assertIn('ProductExporter.properties executed 4 queries', message)
+
+    def test_classes_restored(self):
+        exporter = StrictShopExporter()
+        with self.assertRaises(QueryBudgetExceeded):
+            exporter.export(Shop.objects.all())
+
+        # counting is mixed in only while strict export runs
+        self.assertIs(type(exporter), StrictShopExporter)
+        products = exporter.nested_exporters['products']
+        self.assertIs(products.exporter_class, ProductExporter)
+        self.assertEqual(products.get_number(), 2)
+        for product_exporter in products.exporters:
+            self.assertIs(type(product_exporter), ProductExporter)
+            self.assertIs(type(product_exporter.nested_exporters['properties'].exporters[0]), ProductPropertyExporter)
+
+    def test_warn(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            WarningShopExporter().export(Shop.objects.all())
+
+        self.assertEqual(len(caught), 1)
+        self.assertTrue(issubclass(caught[0].category, QueryBudgetWarning))
+
+    def test_prefetched(self):
+        PrefetchedShopExporter().export(Shop.objects.all())
+
+    def test_max_queries(self):
+        class BudgetShopExporter(PrefetchedShopExporter):
+            max_queries = 2
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, '3 queries executed, budget is 2'):
+            BudgetShopExporter().export(Shop.objects.all())
+
+    def test_one_root_object(self):
+        shop = ShopFactory()
+        for product in ProductFactory.create_batch(size=20, shop=shop):
+            ProductPropertyFactory(product=product)
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'ProductExporter.properties executed 20 queries'):
+            StrictShopExporter().export(Shop.objects.filter(pk=shop.pk))
+
+    def test_prefetched_chunks(self):
+        class ChunkedShopExporter(PrefetchedShopExporter):
+            chunk_size = 1
+
+        # prefetches are executed once per chunk, not per object of any exporter
+        ChunkedShopExporter().export(Shop.objects.all())
@@ -0,0 +1,149 @@
+import dataclasses
+from importlib.util import find_spec
+from typing import List, Optional
+from unittest import skipUnless
+
+from django.test import SimpleTestCase
+
+from cronista.base import ModelExporter
+from cronista.readers.objects import ObjectReader
+from cronista.xlsx.exporter import XlsxModelExporter
+
+
+@dataclasses.dataclass
+class PropertyData:
+    name: str
+    quantity: int = dataclasses.field(metadata={'title': 'Quantity, pcs'})
+
+
+@dataclasses.dataclass
+class ProductData:
+    description: str
+    properties: List[PropertyData]
+
+
+class PropertyExporter(ModelExporter):
+    model_reader = ObjectReader(PropertyData)
+    fields = ('name', 'quantity')
+
+
+class ProductExporter(XlsxModelExporter):
+    model_reader = ObjectReader(ProductData)
+    fields = ('description',)
+    related = {
+        'properties': PropertyExporter,
+    }
+
+
+def export_rows(exporter_class, objects, compiled=False):
+    exporter = type(exporter_class.__name__, (exporter_class,), {'compiled': compiled})()
+    exporter.export(objects)
+    return [[cell.value for cell in row] for row in exporter.exporter_writer.ws.iter_rows()]
+
+
+class ObjectReaderTestCase(SimpleTestCase):
+
+    def test(self):
+        products = [
+            ProductData('Phone', [PropertyData('color', 1), PropertyData('size', 2)]),
+            ProductData('Case', []),
+        ]
+
+        rows = export_rows(ProductExporter, products)
+        self.assertEqual(rows, [
+            ['Description', 'Properties', None],
+            [None, 'Name', 'Quantity, pcs'],
+            ['Phone', 'color', '1'],
+            ['Phone', 'size', '2'],
+            ['Case', None, None],
+        ])
+        self.assertEqual(export_rows(ProductExporter, products, compiled=True), rows)
+
+    def test_preview(self):
+        products = [
+            ProductData('Phone', [PropertyData('color', 1), PropertyData('size', 2)]),
+            ProductData('Case', []),
+        ]
+
+        preview = ProductExporter().preview(products, size=1)
+        self.assertEqual((preview.rows, preview.columns), (5, 3))
+
+    def test_not_supported(self):
+        with self.assertRaises(ValueError):
+            ObjectReader(dict)
+
+    @skipUnless(find_spec('attr'), 'attrs is not installed')
+    def test_attrs(self):
+        import attr
+
+        @attr.s
+        class Shop:
+            name = attr.ib(metadata={'title': 'Shop'})
+            main_product = attr.ib(default=None)
+
+        reader = ObjectReader(Shop)
+        shop = Shop('First', ProductData('Phone', []))
+        self.assertEqual(reader.get_field_name('name'), 'Shop')
+        self.assertEqual(reader.get_field_name('main_product'), 'Main Product')
+        self.assertEqual(reader.get_field_value(shop, 'name'), 'First')
+        self.assertEqual(reader.get_related_field_value(shop, 'main_product'), [shop.main_product])
+        self.assertEqual(reader.get_related_field_value(Shop('Second'), 'main_product'), [])
+
+
+@skipUnless(find_spec('pydantic'), 'pydantic is not installed')
+class PydanticModelReaderTestCase(SimpleTestCase):
+
+    def setUp(self):
+        from pydantic import BaseModel, Field
+
+        from cronista.readers.pydantic import PydanticModelReader
+
+        class Property(BaseModel):
+            name: str
+            quantity: int = Field(title='Quantity, pcs')
+
+        class Product(BaseModel):
+            description: str
+            main_property: Optional[Property] = None
+
+        class PydanticPropertyExporter(ModelExporter):
+            state = ModelExporter.HORIZONTAL
+            model_reader = PydanticModelReader(Property)
+            fields = ('name', 'quantity')
+
+        class PydanticProductExporter(XlsxModelExporter):
+            model_reader = PydanticModelReader(Product)
+            fields = ('description',)
+            related = {
+                'main_property': PydanticPropertyExporter,
+            }
+
+        self.product_class = Product
+        self.exporter_class = PydanticProductExporter
+
+    def test(self):
+        products = [
+            self.product_class(description='Phone', main_property={'name': 'color', 'quantity': 1}),
+            self.product_class(description='Case'),
+        ]
+
+        rows = export_rows(self.exporter_class, products)
+        self.assertEqual(rows, [
+            ['Description', 'Main Property', None],
+            [None, 'Name', 'Quantity, pcs'],
+            ['Phone', 'color', '1'],
+            ['Case', None, None],
+        ])
+        self.assertEqual(export_rows(self.exporter_class, products, compiled=True), rows)
+        self.assertEqual(export_rows(self.exporter_class, [product.model_dump() for product in products]), rows)
+
+    def test_preview(self):
+        products = [
+            self.product_class(description='Phone', main_property={'name': 'color', 'quantity': 1}),
+            self.product_class(description='Case'),
+        ]
+
+        preview = self.exporter_class().preview(products, size=1, html=True)
+        self.assertIn('Phone', preview.content)
+        self.assertNotIn('Case', preview.content)
+        self.assertEqual((preview.rows, preview.columns), (4, 3))
@@ -0,0 +1,88 @@
+from django.test import SimpleTestCase
+
+from cronista.csv.writer import CsvWriter
+from cronista.xlsx.writer import OpenPyXlWriter, MappedOpenPyXlWriter
+
+
+class OpenPyXlWriterTestCase(SimpleTestCase):
+
+    def test_write_row(self):
+        writer = OpenPyXlWriter()
+        writer.write_row(y=2, x_start=3, values=['a', None, 1])
+
+        self.assertEqual(writer.ws.cell(row=2, column=3).value, 'a')
+        self.assertEqual(writer.ws.cell(row=2, column=4).value, '')
+        self.assertEqual(writer.ws.cell(row=2, column=5).value, '1')
+
+    def test_write_block(self):
+        writer = OpenPyXlWriter()
+        writer.write_block(y_start=1, x_start=1, rows=[['a', 'b'], ['c', 'd']])
+
+        values = [[cell.value for cell in row] for row in writer.ws.iter_rows()]
+        self.assertEqual(values, [['a', 'b'], ['c', 'd']])
+
+    def test_autosize_columns(self):
+        writer = OpenPyXlWriter()
+        writer.autosize_columns = True
+        writer.max_column_width = 20
+        writer.write_row(y=3, x_start=1, values=['abc', 'x' * 30])
+        writer.write(x=1, y=4, value='abcdef')
+        writer.move_left(x_from=2, steps=1)
+        writer.duplicate_range(min_col=3, min_row=3, max_col=3, max_row=3, row_shift=1, col_shift=1)
+
+        dimensions = writer.get_workbook().active.column_dimensions
+        self.assertEqual(dimensions['A'].width, 8)
+        self.assertEqual(dimensions['C'].width, 20)
+        self.assertEqual(dimensions['D'].width, 20)
+        self.assertNotIn('B', dimensions)
+
+
+class CsvWriterTestCase(SimpleTestCase):
+
+    def test_write_row(self):
+        writer = CsvWriter()
+        writer.write_row(y=1, x_start=2, values=['a', None, 1])
+        writer.write_block(y_start=2, x_start=1, rows=[['b'], ['c']])
+
+        self.assertEqual(writer.to_text().splitlines(), [',a,,1', 'b,,,', 'c,,,'])
+
+    def test_move_left(self):
+        writer = CsvWriter()
+        writer.write_row(y=1, x_start=1, values=['a', 'b'])
+        writer.move_left(x_from=2, steps=2)
+
+        self.assertEqual(writer.to_text().splitlines(), ['a,,,b'])
+
+
+class MappedOpenPyXlWriterTestCase(SimpleTestCase):
+
+    def _values(self, writer):
+        return [[cell.value for cell in row] for row in writer.get_workbook().active.iter_rows()]
+
+    def test_move_left(self):
+        writer = MappedOpenPyXlWriter()
+        writer.write_row(y=1, x_start=1, values=['a', 'b', 'c'])
+        writer.move_left(x_from=2, steps=2)
+        writer.write(x=2, y=2, value='d')
+
+        self.assertEqual(self._values(writer), [['a', None, None, 'b', 'c'], [None, 'd', None, None, None]])
+
+    def test_duplicate_and_merge(self):
+        writer = MappedOpenPyXlWriter()
+        writer.write_row(y=1, x_start=1, values=['a', 'b'])
+        writer.merge_range(min_col=1, min_row=2, max_col=2, max_row=2)
+        writer.duplicate_range(min_col=2, min_row=1, max_col=None, max_row=1, row_shift=2)
+        writer.move_left(x_from=1, steps=1)
+
+        self.assertEqual(self._values(writer), [[None, 'a', 'b'], [None, None, None], [None, None, 'b']])
+        self.assertEqual([str(r) for r in writer.ws.merged_cells.ranges], ['B2:C2'])
+
+    def test_autosize_columns(self):
+        writer = MappedOpenPyXlWriter()
+        writer.autosize_columns = True
+        writer.write_row(y=1, x_start=1, values=['abc', 'abcdef'])
+        writer.move_left(x_from=2, steps=1)
+        writer.write(x=2, y=2, value='a')
+
+        dimensions = writer.get_workbook().active.column_dimensions
+        self.assertEqual([dimensions[letter].width for letter in 'ABC'], [5, 3, 8])